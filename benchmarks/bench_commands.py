@@ -0,0 +1,59 @@
+"""
+
+Times turning a WebSocket command into a QRC wire frame, comparing the
+pre-encoded template path with the pydantic validate-build-encode fallback.
+
+Usage
+-----
+python -m benchmarks.bench_commands --iterations 100000
+
+"""
+
+import argparse
+import time
+
+from qs_web_socket.blueprints.qsys.dialer import DIALER_TEMPLATES, DialerPayload, _dialer_cmd
+from qs_web_socket.blueprints.qsys.hdmi_select import HDMI_TEMPLATES, HDMIPayload, _hdmi_cmd
+from qs_web_socket.blueprints.qsys.id_generator import generate_id
+from qs_web_socket.blueprints.qsys.lights import LIGHTS_TEMPLATES, LightsPayload, _lights_cmd
+from qs_web_socket.codec import encode
+
+CASES = [
+    ("lights", {"payload": {"value": "lights.75"}}, LIGHTS_TEMPLATES, LightsPayload, _lights_cmd),
+    ("inputs", {"payload": {"value": "input.2"}}, HDMI_TEMPLATES, HDMIPayload, _hdmi_cmd),
+    ("dialer", {"payload": {"action": "dial", "digit": "7"}},
+     DIALER_TEMPLATES, DialerPayload, _dialer_cmd),
+]
+
+
+def _template_frame(message: dict, templates) -> bytes:
+    template, _ = templates.lookup(message)
+    return template.render(generate_id()).frame
+
+
+def _model_frame(message: dict, model, build) -> bytes:
+    (method, params), _ = build(model(**message["payload"]), generate_id())
+    return encode({"jsonrpc": "2.0", "method": method, **params}) + b"\x00"
+
+
+def _time(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'command':<8} {'template':>12} {'pydantic':>12} {'speedup':>8}")
+    for name, message, templates, model, build in CASES:
+        fast = _time(lambda: _template_frame(message, templates), args.iterations)
+        slow = _time(lambda: _model_frame(message, model, build), args.iterations)
+        print(f"{name:<8} {fast * 1e9:>9.0f} ns {slow * 1e9:>9.0f} ns {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+
+End-to-end load test of the gateway against a local fake QRC core.
+
+Starts a FakeCore, runs ``python -m qs_web_socket`` against it in a
+subprocess, then for each client count opens that many ``/qsys`` WebSocket
+connections that send commands in a closed loop. Reports commands/sec,
+command -> Core and command -> acknowledgement latency, and
+poll -> client broadcast latency.
+
+``--pipeline N`` tags every command with a ``request_id`` and keeps N of
+them in flight per connection; with ``--reply-delay`` on the fake core this
+shows what pipelining buys a busy panel.
+
+Usage
+-----
+python -m benchmarks.bench_e2e --clients 1 10 50 --duration 5 --poll-rate 10
+python -m benchmarks.bench_e2e --clients 1 --pipeline 1 8 --reply-delay 0.02
+
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import signal
+import sys
+import tempfile
+import time
+
+from collections import defaultdict, deque
+
+from websockets import connect
+
+from .fake_core import FakeCore, MARKER_PREFIX
+
+COMMANDS = [
+    ({"command": "lights", "payload": {"value": f"lights.{value}"}},
+     ("Lighting_Controller", f"selector.{index}"))
+    for index, value in enumerate(["100", "75", "50", "00"])
+] + [
+    ({"command": "inputs", "payload": {"value": f"input.{index}"}},
+     ("Input_Controller", f"hdmi.out.1.select.hdmi.{index}"))
+    for index in range(1, 4)
+] + [
+    ({"command": "dialer", "payload": {"action": "dial", "digit": str(digit)}},
+     ("Dialer_Controller", f"call.pinpad.{digit}"))
+    for digit in range(10)
+]
+
+
+class Recorder:
+    def __init__(self, core: FakeCore):
+        self.core = core
+        self.outstanding: dict[tuple[str, str], deque[float]] = defaultdict(deque)
+        self.to_core: list[float] = []
+        self.to_ack: list[float] = []
+        self.broadcast: list[float] = []
+        self.acked = 0
+        self.errors = 0
+
+    def reset(self):
+        self.outstanding.clear()
+        self.to_core.clear()
+        self.to_ack.clear()
+        self.broadcast.clear()
+        self.acked = 0
+        self.errors = 0
+
+    def core_received(self, received_at: float, message: dict):
+        if message.get("method") != "Component.Set":
+            return
+
+        params = message["params"]
+        for control in params["Controls"]:
+            pending = self.outstanding.get((params["Name"], control["Name"]))
+            if pending:
+                self.to_core.append(received_at - pending.popleft())
+
+    def client_received(self, received_at: float, message: dict):
+        if message.get("type") != "change_group_update":
+            return
+
+        status = message["components"].get("dialer", {}).get("status", "")
+        sent_at = self.core.poll_sent.get(status)
+
+        if status.startswith(MARKER_PREFIX) and sent_at is not None:
+            self.broadcast.append(received_at - sent_at)
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return float("nan")
+
+    ordered = sorted(samples)
+    index = min(int(len(ordered) * pct / 100), len(ordered) - 1)
+    return ordered[index] * 1000
+
+
+async def _client(
+    url: str,
+    recorder: Recorder,
+    stop: asyncio.Event,
+    offset: int,
+    pipeline: int = 1
+):
+    commands = itertools.islice(itertools.cycle(COMMANDS), offset, None)
+    slots = asyncio.Semaphore(pipeline)
+    sent: dict[int, float] = {}
+
+    async with connect(url, max_queue=None) as websocket:
+        async def reader():
+            async for raw in websocket:
+                received_at = time.perf_counter()
+                message = json.loads(raw)
+
+                if "status" in message:
+                    if message["status"] != "success":
+                        recorder.errors += 1
+
+                    sent_at = sent.pop(message.get("request_id"), None)
+                    if sent_at is not None:
+                        recorder.to_ack.append(received_at - sent_at)
+                        recorder.acked += 1
+                    slots.release()
+                else:
+                    recorder.client_received(received_at, message)
+
+        reader_task = asyncio.create_task(reader())
+
+        try:
+            for request_id in itertools.count():
+                await slots.acquire()
+                if stop.is_set():
+                    break
+
+                message, control = next(commands)
+                sent_at = sent[request_id] = time.perf_counter()
+                recorder.outstanding[control].append(sent_at)
+                await websocket.send(json.dumps({**message, "request_id": request_id}))
+        finally:
+            reader_task.cancel()
+
+
+async def _wait_for_gateway(url: str, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+
+    while True:
+        try:
+            async with connect(url):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def _run(args: argparse.Namespace):
+    recorder: Recorder | None = None
+
+    def on_message(received_at: float, message: dict):
+        if recorder is not None:
+            recorder.core_received(received_at, message)
+
+    core = await FakeCore(
+        port=args.core_port,
+        poll_rate=args.poll_rate,
+        poll_size=args.poll_size,
+        on_message=on_message,
+        reply_delay=args.reply_delay
+    ).start()
+    recorder = Recorder(core)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as config:
+        json.dump({
+            "cores": [{"name": "bench", "host": "127.0.0.1", "port": core.port}],
+            "ws_port": args.ws_port,
+        }, config)
+
+    env = {**os.environ, "QS_WS_CONFIG": config.name}
+    gateway = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "qs_web_socket",
+        env=env,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+
+    url = f"ws://127.0.0.1:{args.ws_port}/qsys"
+
+    try:
+        await _wait_for_gateway(url)
+        print(
+            f"{'clients':>7} {'pipe':>4} {'cmd/s':>9} {'errors':>6} "
+            f"{'core p50':>9} {'core p99':>9} {'ack p50':>9} {'ack p99':>9} "
+            f"{'bcast p50':>9} {'bcast p99':>9} {'bcasts':>8}   (ms)"
+        )
+
+        for clients, pipeline in itertools.product(args.clients, args.pipeline):
+            recorder.reset()
+            stop = asyncio.Event()
+            tasks = [
+                asyncio.create_task(_client(url, recorder, stop, offset, pipeline))
+                for offset in range(clients)
+            ]
+
+            await asyncio.sleep(args.duration)
+            stop.set()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            print(
+                f"{clients:>7} {pipeline:>4} {recorder.acked / args.duration:>9.0f} "
+                f"{recorder.errors:>6} "
+                f"{_percentile(recorder.to_core, 50):>9.2f} "
+                f"{_percentile(recorder.to_core, 99):>9.2f} "
+                f"{_percentile(recorder.to_ack, 50):>9.2f} "
+                f"{_percentile(recorder.to_ack, 99):>9.2f} "
+                f"{_percentile(recorder.broadcast, 50):>9.2f} "
+                f"{_percentile(recorder.broadcast, 99):>9.2f} "
+                f"{len(recorder.broadcast):>8}"
+            )
+    finally:
+        gateway.send_signal(signal.SIGINT)
+        try:
+            await asyncio.wait_for(gateway.wait(), 5)
+        except asyncio.TimeoutError:
+            gateway.kill()
+
+        await core.stop()
+        os.unlink(config.name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--poll-rate", type=float, default=10.0)
+    parser.add_argument("--poll-size", type=int, default=50)
+    parser.add_argument("--pipeline", type=int, nargs="+", default=[1])
+    parser.add_argument("--reply-delay", type=float, default=0.0)
+    parser.add_argument("--core-port", type=int, default=1710)
+    parser.add_argument("--ws-port", type=int, default=8765)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
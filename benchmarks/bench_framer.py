@@ -0,0 +1,97 @@
+"""
+
+Feeds null-terminated QRC traffic through the TCP framer the way
+``TCPConnection._read_loop`` does and reports throughput.
+
+Usage
+-----
+python -m benchmarks.bench_framer --frame-mb 4 --read-size 65536
+
+"""
+
+import argparse
+import json
+import time
+
+from qs_web_socket.comms.framer import Framer
+
+TERMINATOR = b"\x00"
+
+
+def _components_frame(size: int) -> bytes:
+    component = {
+        "Name": "Component_000000",
+        "Type": "device_controller_script",
+        "Properties": [{"Name": "script_type", "Value": "1"}],
+    }
+    count = max(size // len(json.dumps(component)), 1)
+    result = [dict(component, Name=f"Component_{i:06}") for i in range(count)]
+
+    return json.dumps({"jsonrpc": "2.0", "id": 1, "result": result}).encode()
+
+
+def _poll_frame(index: int) -> bytes:
+    return json.dumps({
+        "jsonrpc": "2.0",
+        "method": "ChangeGroup.Poll",
+        "params": {
+            "Id": "Conference_Change_Group",
+            "Changes": [{
+                "Component": "Lighting_Controller",
+                "Name": f"selector.{index % 4}",
+                "String": "true",
+                "Value": 1.0,
+                "Position": 1.0,
+            }],
+        },
+    }).encode()
+
+
+def _chunks(stream: bytes, read_size: int):
+    for offset in range(0, len(stream), read_size):
+        yield stream[offset:offset + read_size]
+
+
+def _run(label: str, stream: bytes, read_size: int, repeat: int):
+    chunks = list(_chunks(stream, read_size))
+    best = float("inf")
+    frames = 0
+
+    for _ in range(repeat):
+        framer = Framer(TERMINATOR)
+        frames = 0
+        started = time.perf_counter()
+
+        for chunk in chunks:
+            frames += len(framer.feed(chunk))
+
+        best = min(best, time.perf_counter() - started)
+
+    megabytes = len(stream) / (1024 * 1024)
+    print(
+        f"{label:<24} {frames:>8} frames  {megabytes:>8.2f} MB  "
+        f"{best * 1000:>9.2f} ms  {megabytes / best:>9.1f} MB/s  "
+        f"{frames / best:>12.0f} frames/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frame-mb", type=float, default=4.0)
+    parser.add_argument("--large-frames", type=int, default=4)
+    parser.add_argument("--poll-frames", type=int, default=100_000)
+    parser.add_argument("--read-size", type=int, default=65536)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    large = _components_frame(int(args.frame_mb * 1024 * 1024)) + TERMINATOR
+    polls = b"".join(_poll_frame(i) + TERMINATOR for i in range(args.poll_frames))
+
+    _run("GetComponents frames", large * args.large_frames,
+         args.read_size, args.repeat)
+    _run("ChangeGroup.Poll burst", polls, args.read_size, args.repeat)
+    _run("mixed", (large + polls) * 2, args.read_size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+
+Times ``translate_changes`` on ChangeGroup.Poll payloads of various sizes.
+
+Usage
+-----
+python -m benchmarks.bench_translate --changes 1000 5000 20000
+
+"""
+
+import argparse
+import random
+import time
+
+from qs_web_socket.blueprints.qsys.component_map import COMPONENT_MAP
+from qs_web_socket.blueprints.qsys.routes import translate_changes
+
+
+def _changes(count: int, seed: int = 1) -> list[dict]:
+    rng = random.Random(seed)
+    controls = [
+        (comp, name)
+        for comp, comp_map in COMPONENT_MAP.items()
+        for name in comp_map["controls"]
+    ]
+
+    changes = []
+    for _ in range(count):
+        comp, name = rng.choice(controls)
+        value = rng.choice([0.0, 1.0])
+        changes.append({
+            "Component": comp,
+            "Name": name,
+            "String": "true" if value else "false",
+            "Value": value,
+            "Position": value,
+            "Disabled": rng.random() < 0.1,
+        })
+
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--changes", type=int, nargs="+",
+                        default=[100, 1000, 5000, 20000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for count in args.changes:
+        changes = _changes(count)
+        best = float("inf")
+
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            translate_changes(changes)
+            best = min(best, time.perf_counter() - started)
+
+        print(
+            f"{count:>8} changes  {best * 1000:>9.3f} ms  "
+            f"{best / count * 1e9:>8.1f} ns/change  {count / best:>12.0f} changes/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+
+A local stand-in for a Q-SYS Core's QRC interface.
+
+Speaks null-terminated JSON-RPC on port 1710, answers every request with a
+result (optionally after ``--reply-delay`` seconds, to stand in for a busy
+core) and, once a change group has been armed with ``ChangeGroup.AutoPoll``,
+pushes ``ChangeGroup.Poll`` results at a fixed rate. Every poll carries a
+unique ``call.status`` string so a client can time poll -> broadcast.
+
+Usage
+-----
+python -m benchmarks.fake_core --port 1710 --poll-rate 10 --poll-size 50 --reply-delay 0.02
+
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from typing import Callable
+
+from qs_web_socket.comms.framer import Framer
+
+MARKER_PREFIX = "bench-"
+DESIGN_CODE = "fake-design"
+
+POLL_CONTROLS = [
+    ("Input_Controller", "hdmi.out.1.select.hdmi.1"),
+    ("Input_Controller", "hdmi.out.1.select.hdmi.2"),
+    ("Input_Controller", "hdmi.out.1.select.hdmi.3"),
+    ("Shades_Controller", "selector.0"),
+    ("Shades_Controller", "selector.1"),
+    ("Lighting_Controller", "selector.0"),
+    ("Lighting_Controller", "selector.1"),
+    ("Lighting_Controller", "selector.2"),
+    ("Lighting_Controller", "selector.3"),
+    ("System_Controller", "load.1"),
+    ("System_Controller", "load.2"),
+    ("System_Controller", "load.3"),
+    ("System_Controller", "load.4"),
+    ("Dialer_Controller", "call.dnd"),
+    ("Dialer_Controller", "call.ringing"),
+]
+
+MessageHook = Callable[[float, dict], None]
+
+
+def _control(name: str) -> dict:
+    return {"Name": name, "String": "0", "Value": 0.0, "Position": 0.0}
+
+
+class FakeCore:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 1710,
+        poll_rate: float = 0.0,
+        poll_size: int = 0,
+        on_message: MessageHook | None = None,
+        reply_delay: float = 0.0
+    ):
+        self.host = host
+        self.port = port
+        self.poll_rate = poll_rate
+        self.poll_size = poll_size
+        self.on_message = on_message
+        self.reply_delay = reply_delay
+
+        self.poll_sent: dict[str, float] = {}
+        self.received = 0
+
+        self._server: asyncio.Server | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._sequence = 0
+        self._rng = random.Random(1)
+
+    async def start(self) -> "FakeCore":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def _poll_result(self, group_id: str) -> dict:
+        self._sequence += 1
+        marker = f"{MARKER_PREFIX}{self._sequence}"
+
+        changes = [{
+            "Component": "Dialer_Controller",
+            "Name": "call.status",
+            "String": marker,
+            "Value": 0.0,
+            "Position": 0.0,
+        }]
+
+        for _ in range(self.poll_size):
+            comp, name = self._rng.choice(POLL_CONTROLS)
+            value = float(self._rng.random() < 0.5)
+            changes.append({
+                "Component": comp,
+                "Name": name,
+                "String": "true" if value else "false",
+                "Value": value,
+                "Position": value,
+            })
+
+        self.poll_sent[marker] = time.perf_counter()
+        return {"Id": group_id, "Changes": changes}
+
+    def _poll_frame(self, group_id: str) -> bytes:
+        message = {
+            "jsonrpc": "2.0",
+            "method": "ChangeGroup.Poll",
+            "params": self._poll_result(group_id),
+        }
+        return json.dumps(message).encode() + b"\x00"
+
+    async def _poll_loop(self, writer: asyncio.StreamWriter, group_id: str):
+        interval = 1 / self.poll_rate
+
+        while not writer.is_closing():
+            writer.write(self._poll_frame(group_id))
+            await writer.drain()
+            await asyncio.sleep(interval)
+
+    def _reply(self, writer: asyncio.StreamWriter, frame: bytes):
+        if not writer.is_closing():
+            writer.write(frame)
+
+    def _start_polling(self, writer: asyncio.StreamWriter, group_id: str):
+        if self.poll_rate <= 0:
+            return
+
+        task = asyncio.create_task(self._poll_loop(writer, group_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        framer = Framer(b"\x00")
+        polling = False
+
+        try:
+            while chunk := await reader.read(65536):
+                for frame in framer.feed(chunk):
+                    received_at = time.perf_counter()
+                    message = json.loads(frame)
+                    self.received += 1
+
+                    if self.on_message is not None:
+                        self.on_message(received_at, message)
+
+                    if message.get("method") == "ChangeGroup.AutoPoll" and not polling:
+                        polling = True
+                        self._start_polling(writer, message["params"]["Id"])
+
+                    if "id" in message:
+                        result = True
+                        if message.get("method") == "ChangeGroup.Poll":
+                            result = self._poll_result(message["params"]["Id"])
+                        elif message.get("method") == "Component.Get":
+                            params = message["params"]
+                            result = {
+                                "Name": params["Name"],
+                                "Controls": [_control(c["Name"]) for c in params["Controls"]],
+                            }
+                        elif message.get("method") == "Control.Get":
+                            result = [_control(name) for name in message["params"]]
+                        elif message.get("method") == "StatusGet":
+                            result = {"DesignName": "fake", "DesignCode": DESIGN_CODE}
+                        elif message.get("method") == "Component.GetComponents":
+                            result = [{"Name": comp, "Type": "custom_controls"}
+                                      for comp in dict.fromkeys(c for c, _ in POLL_CONTROLS)]
+                        elif message.get("method") == "Component.GetControls":
+                            comp = message["params"]["Name"]
+                            result = {
+                                "Name": comp,
+                                "Controls": [_control(name)
+                                             for c, name in POLL_CONTROLS if c == comp],
+                            }
+
+                        reply = {"jsonrpc": "2.0", "id": message["id"], "result": result}
+                        frame = json.dumps(reply).encode() + b"\x00"
+
+                        if self.reply_delay > 0:
+                            asyncio.get_running_loop().call_later(
+                                self.reply_delay, self._reply, writer, frame)
+                        else:
+                            writer.write(frame)
+
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def _serve(args: argparse.Namespace):
+    core = await FakeCore(
+        args.host, args.port, args.poll_rate, args.poll_size, reply_delay=args.reply_delay
+    ).start()
+    print(f"Fake QRC core listening on {core.host}:{core.port}")
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await core.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1710)
+    parser.add_argument("--poll-rate", type=float, default=10.0)
+    parser.add_argument("--poll-size", type=int, default=50)
+    parser.add_argument("--reply-delay", type=float, default=0.0)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+
+Plays a QRC capture (see ``qs_web_socket.comms.capture``) back through the
+gateway with no core attached.
+
+Set ``capture_file`` (``QS_WS_CAPTURE_FILE=/tmp/{core}.qrc``) on a gateway
+talking to a real core to record its traffic, then replay the file here.
+Inbound frames are fed either into the QRC client's data path
+(``--target client``, the default: parsing, change-group dispatch and
+everything after it) or straight into ``handle_poll`` (``--target poll``).
+The gateway's WebSocket server runs on ``--ws-port`` for the duration, and
+``--clients`` attaches that many ``/qsys`` listeners to count what they
+receive.
+
+``--speed`` scales the recorded timing; ``--speed 0`` replays as fast as
+possible. The report shows how far the replay fell behind schedule, which
+is how long the gateway stalled on the busiest stretch of traffic.
+
+Usage
+-----
+python -m benchmarks.replay /tmp/floor3.qrc --speed 10 --clients 20
+
+"""
+
+import argparse
+import asyncio
+import time
+
+from websockets import connect, serve
+
+from qs_web_socket.codec import decode
+from qs_web_socket.comms.capture import INBOUND, CaptureReader
+from qs_web_socket.cores import create_client
+from qs_web_socket.drivers import DRIVERS
+from qs_web_socket.drivers.qsc_core_qrc.registry import CoreRegistry
+from qs_web_socket.server.dispatcher import dispatcher, process_request
+from qs_web_socket.blueprints.qsys.routes import handle_poll
+
+
+def _poll_params(message: dict) -> dict | None:
+    if message.get("method") == "ChangeGroup.Poll":
+        return message.get("params")
+
+    result = message.get("result")
+    if isinstance(result, dict) and "Changes" in result:
+        return result
+    return None
+
+
+async def _listen(websocket, counts: list[int], index: int):
+    async for _ in websocket:
+        counts[index] += 1
+
+
+async def _replay(args: argparse.Namespace, client) -> dict:
+    loop = asyncio.get_running_loop()
+    stats = {"frames": 0, "outbound": 0, "polls": 0, "lag": 0.0, "recorded": 0.0}
+    started = loop.time()
+
+    with CaptureReader(args.capture) as reader:
+        for seconds, direction, payload in reader:
+            stats["recorded"] = seconds
+
+            if direction != INBOUND:
+                stats["outbound"] += 1
+                continue
+
+            delay = 0.0
+            if args.speed > 0:
+                delay = started + seconds / args.speed - loop.time()
+                if delay < 0:
+                    stats["lag"] = max(stats["lag"], -delay)
+
+            # Unthrottled or behind schedule, the listeners and the gateway's
+            # own tasks still get a turn between frames.
+            await asyncio.sleep(max(delay, 0.0))
+
+            frame = bytes(payload)
+            del payload
+            stats["frames"] += 1
+
+            if args.target == "client":
+                await client._tcp_client._emit_data(frame)  # pylint: disable=protected-access
+                continue
+
+            params = _poll_params(decode(frame))
+            if params is not None and "Changes" in params:
+                stats["polls"] += 1
+                await handle_poll(args.core, params)
+
+    # Let queued change-group handlers and the coalescer drain.
+    await asyncio.sleep(0.2)
+    return stats
+
+
+async def _run(args: argparse.Namespace):
+    client = create_client({"name": args.core, "host": "127.0.0.1"})
+    registry = CoreRegistry()
+    registry.add(client)
+    DRIVERS[CoreRegistry] = registry
+
+    async with serve(dispatcher, "127.0.0.1", args.ws_port, process_request=process_request):
+        url = f"ws://127.0.0.1:{args.ws_port}/qsys?core={args.core}"
+        websockets = [await connect(url) for _ in range(args.clients)]
+        counts = [0] * args.clients
+        listeners = [
+            asyncio.create_task(_listen(websocket, counts, i))
+            for i, websocket in enumerate(websockets)
+        ]
+        await asyncio.sleep(0.2)
+
+        wall = time.perf_counter()
+        stats = await _replay(args, client)
+        wall = time.perf_counter() - wall
+
+        for websocket in websockets:
+            await websocket.close()
+        await asyncio.gather(*listeners, return_exceptions=True)
+
+    print(f"recorded        {stats['recorded']:.2f} s")
+    speed = f"{args.speed:g}x" if args.speed > 0 else "unthrottled"
+    print(f"replayed in     {wall:.2f} s ({speed})")
+    print(f"inbound frames  {stats['frames']} ({stats['frames'] / max(wall, 1e-9):.0f}/s)")
+    print(f"outbound frames {stats['outbound']} (not replayed)")
+    if args.target == "poll":
+        print(f"polls handled   {stats['polls']}")
+    print(f"max lag         {stats['lag'] * 1000:.1f} ms")
+    if counts:
+        print(f"ws messages     {sum(counts)} total, {min(counts)}-{max(counts)} per client")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("capture")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--target", choices=("client", "poll"), default="client")
+    parser.add_argument("--core", default="replay")
+    parser.add_argument("--clients", type=int, default=0)
+    parser.add_argument("--ws-port", type=int, default=8765)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,39 +6,27 @@ import signal
 from logging import getLogger
 from websockets import serve
 
+from .config import SETTINGS
 from .logging import configure_logging
 from .drivers import DRIVERS
 
-from .server.dispatcher import dispatcher
+from .server.dispatcher import dispatcher, process_request
+from .server.formats import select_subprotocol
 
-from .drivers.qsc_core_qrc.client import QRCClient
+from .drivers.qsc_core_qrc.registry import CoreRegistry
 
-from .blueprints.qsys.routes import qsys_route_handler, handle_poll
-from .blueprints.qsys.change_groups import register_change_group, invalidate_change_group
+from .blueprints.qsys.routes import qsys_route_handler
+from .broker.server import run_broker
+from .cores import start_cores
 
 configure_logging()
 logger = getLogger(__name__)
 
 
 async def main():
-    client = QRCClient("127.0.0.1", auto_reconnect=True)
+    registry = start_cores()
 
-    @client.on_connect
-    async def __setup(client: QRCClient) -> None:
-        await register_change_group(client)
-
-    @client.on_change_group
-    async def __handle_poll(payload: dict) -> None:
-        await handle_poll(payload)
-
-    @client.on_ws_client_connected
-    async def __invalidate_group(client: QRCClient) -> None:
-        await invalidate_change_group(client)
-
-    client.initialize()
-    client.connect()
-
-    DRIVERS[QRCClient] = client
+    DRIVERS[CoreRegistry] = registry
     stop_event = asyncio.Event()
 
     def handle_sigint(*_):
@@ -47,16 +35,26 @@ async def main():
 
     signal.signal(signal.SIGINT, handle_sigint)
 
+    if SETTINGS.workers > 0:
+        try:
+            await run_broker(registry, stop_event)
+        finally:
+            await registry.disconnect()
+        return
+
     async with serve(
         dispatcher,
-        "127.0.0.1",
-        8765,
+        SETTINGS.ws_host,
+        SETTINGS.ws_port,
+        process_request=process_request,
+        select_subprotocol=select_subprotocol,
     ):
-        logger.info("WebSocket server running on ws://0.0.0.0:8765")
+        logger.info("WebSocket server running on ws://%s:%s",
+                    SETTINGS.ws_host, SETTINGS.ws_port)
         try:
             await stop_event.wait()
         finally:
-            await client.disconnect()
+            await registry.disconnect()
 
 
 if __name__ == "__main__":
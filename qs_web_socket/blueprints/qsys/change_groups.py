@@ -1,74 +1,55 @@
+import time
+
+from logging import getLogger
+
 from ...drivers.qsc_core_qrc.client import QRCClient
 from ...drivers.qsc_core_qrc.commands import ChangeGroup
+from ...drivers.qsc_core_qrc.priority import Priority
+from ...metrics import REGISTRY
+from .component_map import COMPONENTS, change_group_components
 from .id_generator import generate_id
+from .poll_rate import get_poll_controller
 
 CHANGE_GROUP_ID = "Conference_Change_Group"
 
-CHANGE_GROUP_COMPONENTS = [
-    {
-        "Name": "Input_Controller",
-        "Controls": [
-            "hdmi.out.1.select.hdmi.1",
-            "hdmi.out.1.select.hdmi.2",
-            "hdmi.out.1.select.hdmi.3",
-        ],
-    },
-    {
-        "Name": "Shades_Controller",
-        "Controls": [
-            "selector.0",
-            "selector.1",
-        ],
-    },
-    {
-        "Name": "Lighting_Controller",
-        "Controls": [
-            "selector.0",
-            "selector.1",
-            "selector.2",
-            "selector.3",
-        ],
-    },
-    {
-        "Name": "System_Controller",
-        "Controls": [
-            "load.1",
-            "load.2",
-            "load.3",
-            "load.4",
-        ],
-    },
-    {
-        "Name": "Dialer_Controller",
-        "Controls": [
-            "call.dnd",
-            "call.connect",
-            "call.disconnect",
-            "call.ringing",
-            "call.status",
-        ],
-    },
-]
-
+RESYNC_SECONDS = REGISTRY.histogram(
+    "qsys_resync_seconds",
+    "Time to register the change group and complete the first poll after connecting.",
+    ("core",))
 
-async def invalidate_change_group(client: QRCClient) -> tuple[bool, str]:
-    invalidate_group_cmd = ChangeGroup.Invalidate(
-        generate_id(), CHANGE_GROUP_ID)
+CHANGE_GROUP_COMPONENTS = change_group_components(COMPONENTS)
 
-    await client.send(*invalidate_group_cmd)
+logger = getLogger(__name__)
 
 
 async def register_change_group(client: QRCClient) -> tuple[bool, str]:
-    for change_group in CHANGE_GROUP_COMPONENTS:
-        change_group_cmd = ChangeGroup.AddComponentControl(
+    started = time.perf_counter()
+    commands = [
+        ChangeGroup.AddComponentControl(
             generate_id(),
             CHANGE_GROUP_ID,
             change_group["Name"],
             change_group["Controls"]
         )
-        await client.send(*change_group_cmd)
+        for change_group in CHANGE_GROUP_COMPONENTS
+    ]
+
+    # The core drops change groups with the connection, so every (re)connect
+    # registers the whole group in one pipelined batch, then re-arms AutoPoll;
+    # arming polls once, which brings the state view up to date in one pass.
+    results = await client.request_batch(commands, priority=Priority.BULK)
+    errors = [str(result) for result in results if isinstance(result, Exception)]
+
+    for error in errors:
+        logger.warning("(%s) Change group registration failed: %s", client.name, error)
+
+    await get_poll_controller(client, CHANGE_GROUP_ID).arm()
 
-    change_group_auto_poll = ChangeGroup.AutoPoll(
-        generate_id(), CHANGE_GROUP_ID, 3)
+    elapsed = time.perf_counter() - started
+    RESYNC_SECONDS.observe(elapsed, core=client.name)
+    logger.info("(%s) Change group resynced: %d components in %.1f ms",
+                client.name, len(commands), elapsed * 1000)
 
-    await client.send(*change_group_auto_poll)
+    if errors:
+        return False, "; ".join(errors)
+    return True, ""
@@ -0,0 +1,39 @@
+import asyncio
+
+from typing import Any, Awaitable, Callable, Hashable
+
+FlushFn = Callable[[Any, dict[str, dict[str, Any]], float], Awaitable[None]]
+
+
+class UpdateCoalescer:
+    def __init__(self, window: float, flush: FlushFn):
+        self._window = window
+        self._flush = flush
+        self._pending: dict[Hashable, dict[str, dict[str, Any]]] = {}
+        # When the oldest change merged into each pending update arrived.
+        self._received: dict[Hashable, float] = {}
+        self._task: asyncio.Task | None = None
+
+    async def push(self, key: Hashable, components: dict[str, dict[str, Any]], received: float):
+        if self._window <= 0:
+            await self._flush(key, components, received)
+            return
+
+        self._received.setdefault(key, received)
+
+        pending = self._pending.setdefault(key, {})
+        for comp, controls in components.items():
+            pending.setdefault(comp, {}).update(controls)
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self._window)
+
+        pending, self._pending = self._pending, {}
+        received, self._received = self._received, {}
+        self._task = None
+
+        for key, components in pending.items():
+            await self._flush(key, components, received[key])
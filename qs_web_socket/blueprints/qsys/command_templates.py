@@ -0,0 +1,58 @@
+from typing import Any, Callable, Iterable
+
+from pydantic import BaseModel, ValidationError
+
+from ...drivers.qsc_core_qrc.templates import CommandTemplate, PreparedMessage
+
+BuildFn = Callable[[Any, int], tuple[tuple[str, dict], str]]
+TemplateEntry = tuple[CommandTemplate, str]
+Command = tuple[str, dict] | PreparedMessage
+
+
+class CommandTemplates:
+    """
+    Wire templates for every payload a command accepts from a finite set.
+
+    Each payload is validated and built once, through the same model and
+    builder the handler falls back to, so the two paths cannot drift apart.
+    """
+
+    def __init__(self, model: type[BaseModel], build: BuildFn, payloads: Iterable[dict]):
+        self._model = model
+        self._build = build
+        self._templates: dict[frozenset, TemplateEntry] = {}
+
+        for payload in payloads:
+            cmd, description = build(model(**payload), 0)
+            self._templates[frozenset(payload.items())] = (CommandTemplate(*cmd), description)
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def lookup(self, message: dict) -> TemplateEntry | None:
+        payload = message.get("payload")
+        if not isinstance(payload, dict):
+            return None
+
+        try:
+            return self._templates.get(frozenset(payload.items()))
+        except TypeError:
+            return None
+
+    # The command and its description, or None and the validation error.
+    def build(self, message: dict, id_: int) -> tuple[Command | None, str]:
+        entry = self.lookup(message)
+        if entry is not None:
+            template, description = entry
+            return template.render(id_), description
+
+        payload = message.get("payload", {})
+        if not isinstance(payload, dict):
+            return None, "payload must be an object"
+
+        try:
+            model = self._model(**payload)
+        except ValidationError as e:
+            return None, "; ".join(err["msg"] for err in e.errors())
+
+        return self._build(model, id_)
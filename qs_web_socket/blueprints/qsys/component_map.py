@@ -0,0 +1,103 @@
+from logging import getLogger
+
+from ...config import SETTINGS
+from ...drivers.qsc_core_qrc.design import DesignComponents, load_design
+from ...drivers.qsc_core_qrc.design.nrbf import NRBFError
+
+logger = getLogger(__name__)
+
+# Frontend names for the controls the UI uses. When a design file is
+# configured, components it does not contain are not registered.
+COMPONENT_MAP = {
+    "Input_Controller": {
+        "frontend": "inputs",
+        "controls": {
+            "hdmi.out.1.select.hdmi.1": "input.1",
+            "hdmi.out.1.select.hdmi.2": "input.2",
+            "hdmi.out.1.select.hdmi.3": "input.3",
+        },
+    },
+    "Shades_Controller": {
+        "frontend": "shades",
+        "controls": {
+            "selector.0": "open",
+            "selector.1": "close",
+        },
+    },
+    "Lighting_Controller": {
+        "frontend": "lights",
+        "controls": {
+            "selector.0": "lights.100",
+            "selector.1": "lights.75",
+            "selector.2": "lights.50",
+            "selector.3": "lights.00",
+        },
+    },
+    "System_Controller": {
+        "frontend": "system",
+        "controls": {
+            "load.1": "preset.1",
+            "load.2": "preset.2",
+            "load.3": "preset.3",
+            "load.4": "preset.4",
+        },
+    },
+    "Dialer_Controller": {
+        "frontend": "dialer",
+        "controls": {
+            "call.dnd": "dnd",
+            "call.connect": "connect",
+            "call.disconnect": "disconnect",
+            "call.ringing": "ringing",
+            "call.status": "status",
+        },
+    },
+}
+
+
+def build_component_map(component_map: dict, design: DesignComponents) -> dict:
+    result = {}
+
+    for comp, comp_map in component_map.items():
+        if comp not in design:
+            logger.warning("Component %s is not in the design, skipping", comp)
+            continue
+
+        # The design lists only the controls whose values it stores, so a
+        # control it does not mention may still exist on the core.
+        available = set(design[comp]["controls"])
+        missing = [name for name in comp_map["controls"] if name not in available]
+        if missing:
+            logger.warning("Design does not list %s controls %s; keeping them",
+                           comp, ", ".join(missing))
+
+        result[comp] = comp_map
+
+    return result
+
+
+def change_group_components(component_map: dict) -> list[dict]:
+    return [
+        {"Name": comp, "Controls": list(comp_map["controls"])}
+        for comp, comp_map in component_map.items()
+        if comp_map["controls"]
+    ]
+
+
+def load_component_map(
+    path: str | None = SETTINGS.design_file,
+    cache_dir: str | None = SETTINGS.design_cache_dir
+) -> dict:
+    if not path:
+        return COMPONENT_MAP
+
+    try:
+        design = load_design(path, cache_dir)
+    except (OSError, NRBFError) as e:
+        logger.warning("Could not load design %s, using the built-in map: %s", path, e)
+        return COMPONENT_MAP
+
+    return build_component_map(COMPONENT_MAP, design)
+
+
+COMPONENTS = load_component_map()
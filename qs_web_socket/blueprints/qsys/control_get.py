@@ -0,0 +1,98 @@
+"""
+
+Examples
+--------
+{
+    "command": "get",
+    "payload": {
+        "component": "Lighting_Controller",
+        "controls": ["selector.0", "selector.1"]
+    }
+}
+
+{
+    "command": "get",
+    "payload": {
+        "controls": ["MainGain"]
+    }
+}
+
+Without a component the names are read as named controls. Values are
+answered from a short-lived cache when possible, and component controls
+are checked against the core's discovered design first.
+
+"""
+
+from typing import Any, Optional
+
+from pydantic import BaseModel, Field, ValidationError
+
+from ...config import SETTINGS
+from ...drivers.qsc_core_qrc.client import QRCClient
+from ...drivers.qsc_core_qrc.commands import Component, Control
+from .core_request import REQUEST_ERRORS, request_error_message
+from .discovery import DISCOVERY
+from .id_generator import generate_id
+from .read_cache import ControlValue, control_value, get_read_cache
+
+
+FETCH_TIMEOUT = 5.0
+
+
+class GetPayload(BaseModel):
+    component: Optional[str] = None
+    controls: list[str] = Field(min_length=1, max_length=256)
+
+
+async def fetch_controls(
+    client: QRCClient,
+    component: Optional[str],
+    names: list[str]
+) -> dict[str, ControlValue]:
+    if component:
+        cmd = Component.Get(generate_id(), component, names)
+    else:
+        cmd = Control.Get(generate_id(), names)
+
+    result: Any = await client.request(
+        *cmd, timeout=FETCH_TIMEOUT, deadline=SETTINGS.command_deadline)
+    entries = result.get("Controls", []) if isinstance(result, dict) else result or []
+
+    return {entry["Name"]: control_value(entry) for entry in entries if "Name" in entry}
+
+
+async def get_command(message: dict, client: QRCClient) -> tuple[bool, str | dict]:
+    raw = message.get("payload", {})
+    if not isinstance(raw, dict):
+        return False, "payload must be an object"
+
+    try:
+        payload = GetPayload(**raw)
+    except ValidationError as e:
+        messages = [err["msg"] for err in e.errors()]
+        return False, "; ".join(messages)
+
+    # Names the core is known not to have are refused without asking it.
+    index = DISCOVERY.get(client.name)
+    if index is not None and payload.component:
+        if payload.component not in index.components:
+            return False, f"unknown component: {payload.component}"
+
+        unknown = index.unknown_controls(payload.component, payload.controls)
+        if unknown:
+            return False, f"unknown controls on {payload.component}: {', '.join(unknown)}"
+
+    try:
+        values = await get_read_cache(client.name).get(
+            payload.component or "",
+            payload.controls,
+            lambda names: fetch_controls(client, payload.component, names)
+        )
+    except REQUEST_ERRORS as e:
+        return False, request_error_message(e)
+
+    return True, {
+        "message": f"read {len(values)} of {len(payload.controls)} controls",
+        "component": payload.component,
+        "controls": values,
+    }
@@ -0,0 +1,33 @@
+import asyncio
+
+from ...config import SETTINGS
+from ...drivers.qsc_core_qrc.client import QRCClient
+from ...drivers.qsc_core_qrc.priority import DeadlineExceeded
+from ...drivers.qsc_core_qrc.responses import QRCError
+from ...drivers.qsc_core_qrc.templates import PreparedMessage
+
+REQUEST_ERRORS = (QRCError, asyncio.TimeoutError, ConnectionError)
+
+
+def request_error_message(error: Exception) -> str:
+    # DeadlineExceeded is a TimeoutError but says which deadline was missed.
+    if isinstance(error, asyncio.TimeoutError) and not isinstance(error, DeadlineExceeded):
+        return "timed out waiting for the core to respond"
+    return str(error)
+
+
+async def core_request(
+    client: QRCClient,
+    cmd: tuple[str, dict] | PreparedMessage,
+    timeout: float = 5.0,
+    deadline: float | None = SETTINGS.command_deadline
+) -> tuple[bool, str]:
+    try:
+        if isinstance(cmd, PreparedMessage):
+            await client.request_prepared(cmd, timeout=timeout, deadline=deadline)
+        else:
+            await client.request(*cmd, timeout=timeout, deadline=deadline)
+    except REQUEST_ERRORS as e:
+        return False, request_error_message(e)
+
+    return True, ""
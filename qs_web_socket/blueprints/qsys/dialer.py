@@ -17,18 +17,23 @@ Examples
 from functools import partial
 from typing import Literal, Optional
 
-from pydantic import BaseModel, ValidationError, field_validator, ValidationInfo
+from pydantic import BaseModel, Field, field_validator, ValidationInfo
 
 from ...drivers.qsc_core_qrc.client import QRCClient
 from ...drivers.qsc_core_qrc.commands import Component
 from .id_generator import generate_id
+from .core_request import core_request
+from .command_templates import CommandTemplates
 
 
 class DialerPayload(BaseModel):
     action: Literal["dial", "answer", "disconnect", "dnd"]
+    # Defaults are validated too, so a missing digit or state is caught by
+    # the validators below rather than by the builder.
     digit: Optional[Literal["0", "1", "2", "3", "4",
-                            "5", "6", "7", "8", "9", "*", "#"]] = None
-    state: Optional[Literal["enable", "disable"]] = None
+                            "5", "6", "7", "8", "9", "*", "#"]] = Field(
+        None, validate_default=True)
+    state: Optional[Literal["enable", "disable"]] = Field(None, validate_default=True)
 
     @field_validator("digit", mode="before")
     def require_digit_if_dial(cls, v, info: ValidationInfo):
@@ -54,14 +59,8 @@ ACTION_MAPPING = {
 }
 
 
-async def dialer_command(message: dict, client: QRCClient) -> tuple[bool, str]:
-    try:
-        payload = DialerPayload(**message.get("payload", {}))
-    except ValidationError as e:
-        messages = [err["msg"] for err in e.errors()]
-        return False, "; ".join(messages)
-
-    base_command = partial(Component.Set, generate_id(), DIALER_SELECTOR)
+def _dialer_cmd(payload: DialerPayload, id_: int) -> tuple[tuple[str, dict], str]:
+    base_command = partial(Component.Set, id_, DIALER_SELECTOR)
 
     if payload.action == "dial":
         control_name = PINPAD_MAPPING[payload.digit]
@@ -87,5 +86,25 @@ async def dialer_command(message: dict, client: QRCClient) -> tuple[bool, str]:
         )
         description = f"{payload.action}ed call"
 
-    await client.send(*cmd)
+    return cmd, description
+
+
+DIALER_TEMPLATES = CommandTemplates(
+    DialerPayload,
+    _dialer_cmd,
+    [{"action": "dial", "digit": digit} for digit in PINPAD_MAPPING]
+    + [{"action": "dnd", "state": state} for state in ("enable", "disable")]
+    + [{"action": action} for action in ACTION_MAPPING]
+)
+
+
+async def dialer_command(message: dict, client: QRCClient) -> tuple[bool, str]:
+    cmd, description = DIALER_TEMPLATES.build(message, generate_id())
+    if cmd is None:
+        return False, description
+
+    success, error = await core_request(client, cmd)
+    if not success:
+        return False, error
+
     return True, f"successfully {description}"
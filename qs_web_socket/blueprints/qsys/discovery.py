@@ -0,0 +1,163 @@
+"""
+Index of the components and controls a running core exposes.
+
+`Component.GetComponents` and a `Component.GetControls` per component are
+slow on a large design, so the result is stored on disk under the design
+code `StatusGet` reports. A reconnect or restart against the same design
+reads the file; only a newly deployed design is discovered again.
+
+Examples:
+    index = DISCOVERY["Floor 3"]
+    index.components["Dialer_Controller"]
+    # {"type": "softphone", "controls": {"call.dnd": {"type": "Boolean", ...}}}
+"""
+
+import time
+
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Any, Callable
+
+from ...cache_files import cache_path, load_cache, save_cache
+from ...config import SETTINGS
+from ...drivers.qsc_core_qrc.client import QRCClient
+from ...drivers.qsc_core_qrc.commands import Component, Status
+from ...drivers.qsc_core_qrc.priority import Priority
+from .component_map import COMPONENTS
+from .core_request import REQUEST_ERRORS, request_error_message
+from .id_generator import generate_id
+
+DiscoveredComponents = dict[str, dict[str, Any]]
+DiscoverySink = Callable[[str, "DesignIndex"], None]
+
+CACHE_VERSION = 1
+
+logger = getLogger(__name__)
+
+
+@dataclass
+class DesignIndex:
+    design_code: str | None
+    design_name: str | None
+    components: DiscoveredComponents
+
+    def unknown_controls(self, component: str, names: list[str]) -> list[str]:
+        controls = self.components[component]["controls"]
+        if controls is None:
+            return []
+        return [name for name in names if name not in controls]
+
+
+DISCOVERY: dict[str, DesignIndex] = {}
+
+# Told about every new index; the broker forwards them to its workers.
+DISCOVERY_SINKS: list[DiscoverySink] = []
+
+
+def load_discovery(cache_dir: str, design_code: str) -> DiscoveredComponents | None:
+    cached = load_cache(
+        cache_path(cache_dir, "discovery", design_code), CACHE_VERSION, design_code=design_code)
+    return cached.get("components") if cached is not None else None
+
+
+def save_discovery(cache_dir: str, design_code: str, components: DiscoveredComponents):
+    save_cache(cache_path(cache_dir, "discovery", design_code), CACHE_VERSION, {
+        "design_code": design_code,
+        "components": components,
+    })
+
+
+async def _discover(client: QRCClient) -> tuple[DiscoveredComponents, list[str]]:
+    timeout = SETTINGS.discovery_timeout
+    listed = await client.request(
+        *Component.GetComponents(generate_id()), timeout=timeout, priority=Priority.BULK)
+
+    # A malformed reply is recorded as an error, so the index is used for this
+    # session but never stored, rather than failing the connect hook.
+    errors = []
+    if not isinstance(listed, list):
+        errors.append(f"components: expected a list, got {type(listed).__name__}")
+        listed = []
+
+    components: DiscoveredComponents = {}
+    for entry in listed:
+        if isinstance(entry, dict) and isinstance(entry.get("Name"), str):
+            components[entry["Name"]] = {"type": entry.get("Type"), "controls": {}}
+        else:
+            errors.append(f"components: malformed entry {entry!r}")
+
+    results = await client.request_batch(
+        [Component.GetControls(generate_id(), name) for name in components],
+        timeout=timeout
+    )
+
+    for name, result in zip(components, results):
+        if isinstance(result, Exception):
+            errors.append(f"{name}: {result}")
+            components[name]["controls"] = None
+            continue
+
+        entries = result.get("Controls") if isinstance(result, dict) else None
+        if not isinstance(entries, list):
+            errors.append(f"{name}: malformed control list")
+            components[name]["controls"] = None
+            continue
+
+        controls = components[name]["controls"]
+        for control in entries:
+            if isinstance(control, dict) and isinstance(control.get("Name"), str):
+                controls[control["Name"]] = {
+                    "type": control.get("Type"),
+                    "direction": control.get("Direction"),
+                }
+            else:
+                errors.append(f"{name}: malformed control {control!r}")
+
+    return components, errors
+
+
+async def refresh_discovery(client: QRCClient) -> tuple[bool, str]:
+    started = time.perf_counter()
+
+    try:
+        status = await client.request(*Status.StatusGet(generate_id()), priority=Priority.BULK)
+        if not isinstance(status, dict):
+            status = {}
+        design_code = status.get("DesignCode") or None
+
+        components = None
+        if design_code:
+            components = load_discovery(SETTINGS.design_cache_dir, design_code)
+
+        source = "cache"
+        errors: list[str] = []
+        if components is None:
+            source = "core"
+            components, errors = await _discover(client)
+    except REQUEST_ERRORS as e:
+        message = request_error_message(e)
+        logger.warning("(%s) Discovery failed: %s", client.name, message)
+        return False, message
+
+    # A partial result is used for this session but never stored.
+    for error in errors:
+        logger.warning("(%s) Discovery of %s", client.name, error)
+    if source == "core" and design_code and not errors:
+        save_discovery(SETTINGS.design_cache_dir, design_code, components)
+
+    index = DesignIndex(design_code, status.get("DesignName"), components)
+    DISCOVERY[client.name] = index
+    for sink in DISCOVERY_SINKS:
+        sink(client.name, index)
+
+    missing = [name for name in COMPONENTS if name not in components]
+    if missing:
+        logger.warning("(%s) Design %s has no %s", client.name,
+                       status.get("DesignName"), ", ".join(missing))
+
+    logger.info("(%s) Discovered %d components from %s in %.1f ms", client.name,
+                len(components), source, (time.perf_counter() - started) * 1000)
+
+    if errors:
+        return False, "; ".join(errors)
+    return True, ""
@@ -13,11 +13,13 @@ Examples
 from functools import partial
 from typing import Literal
 
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel
 
 from ...drivers.qsc_core_qrc.client import QRCClient
 from ...drivers.qsc_core_qrc.commands import Component
 from .id_generator import generate_id
+from .core_request import core_request
+from .command_templates import CommandTemplates
 
 
 class HDMIPayload(BaseModel):
@@ -35,20 +37,31 @@ class HDMIPayload(BaseModel):
 HDMI_SELECTOR = "Input_Controller"
 
 
-async def hdmi_command(message: dict, client: QRCClient) -> tuple[bool, str]:
-    try:
-        payload = HDMIPayload(**message.get("payload", {}))
-    except ValidationError as e:
-        messages = [err["msg"] for err in e.errors()]
-        return False, "; ".join(messages)
-
-    base_command = partial(Component.Set, generate_id(), HDMI_SELECTOR)
+def _hdmi_cmd(payload: HDMIPayload, id_: int) -> tuple[tuple[str, dict], str]:
+    base_command = partial(Component.Set, id_, HDMI_SELECTOR)
     target_hdmi = f"hdmi.out.1.select.hdmi.{payload.input_index()}"
 
     cmd = base_command(
         [{"Name": target_hdmi, "Value": 1, "Ramp": 0}],
         response_values=True,
     )
+    return cmd, f"switched HDMI to {payload.value}"
+
+
+HDMI_TEMPLATES = CommandTemplates(
+    HDMIPayload,
+    _hdmi_cmd,
+    [{"value": value} for value in ("input.1", "input.2", "input.3")]
+)
+
+
+async def hdmi_command(message: dict, client: QRCClient) -> tuple[bool, str]:
+    cmd, description = HDMI_TEMPLATES.build(message, generate_id())
+    if cmd is None:
+        return False, description
+
+    success, error = await core_request(client, cmd)
+    if not success:
+        return False, error
 
-    await client.send(*cmd)
-    return True, f"successfully switched HDMI to {payload.value}"
+    return True, f"successfully {description}"
@@ -14,11 +14,13 @@ Examples
 from functools import partial
 from typing import Literal
 
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel
 
 from ...drivers.qsc_core_qrc.client import QRCClient
 from ...drivers.qsc_core_qrc.commands import Component
 from .id_generator import generate_id
+from .core_request import core_request
+from .command_templates import CommandTemplates
 
 
 class LightsPayload(BaseModel):
@@ -37,18 +39,29 @@ class LightsPayload(BaseModel):
 LIGHTS_SELECTOR = "Lighting_Controller"
 
 
-async def lights_command(message: dict, client: QRCClient) -> tuple[bool, str]:
-    try:
-        payload = LightsPayload(**message.get("payload", {}))
-    except ValidationError as e:
-        messages = [err["msg"] for err in e.errors()]
-        return False, "; ".join(messages)
-
-    base_command = partial(Component.Set, generate_id(), LIGHTS_SELECTOR)
+def _lights_cmd(payload: LightsPayload, id_: int) -> tuple[tuple[str, dict], str]:
+    base_command = partial(Component.Set, id_, LIGHTS_SELECTOR)
     cmd = base_command(
         [{"Name": f"selector.{payload.selector_index()}", "Value": 1, "Ramp": 0}],
         response_values=True,
     )
+    return cmd, f"sent lights {payload.value} command"
+
+
+LIGHTS_TEMPLATES = CommandTemplates(
+    LightsPayload,
+    _lights_cmd,
+    [{"value": value} for value in ("lights.100", "lights.75", "lights.50", "lights.00")]
+)
+
+
+async def lights_command(message: dict, client: QRCClient) -> tuple[bool, str]:
+    cmd, description = LIGHTS_TEMPLATES.build(message, generate_id())
+    if cmd is None:
+        return False, description
+
+    success, error = await core_request(client, cmd)
+    if not success:
+        return False, error
 
-    await client.send(*cmd)
-    return True, f"successfully sent lights {payload.value} command"
+    return True, f"successfully {description}"
@@ -0,0 +1,141 @@
+import asyncio
+import time
+
+from logging import getLogger
+
+from ...config import SETTINGS
+from ...drivers.qsc_core_qrc.client import QRCClient
+from ...drivers.qsc_core_qrc.commands import ChangeGroup
+from ...drivers.qsc_core_qrc.responses import QRCError
+from .id_generator import generate_id
+
+logger = getLogger(__name__)
+
+
+class AutoPollController:
+    def __init__(
+        self,
+        client: QRCClient,
+        group_id: str,
+        idle_rate: float,
+        normal_rate: float,
+        active_rate: float,
+        active_hold: float,
+        idle_delay: float
+    ):
+        self._client = client
+        self._group_id = group_id
+        self._idle_rate = idle_rate
+        self._normal_rate = normal_rate
+        self._active_rate = active_rate
+        self._active_hold = active_hold
+        self._idle_delay = idle_delay
+
+        self._armed = False
+        self._rate: float | None = None
+        self._clients = 0
+        self._ringing = False
+        self._active_until = 0.0
+        self._idle_after = 0.0
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def rate(self) -> float | None:
+        return self._rate
+
+    async def arm(self):
+        self._armed = True
+        self._rate = None
+        await self._apply()
+        await self._poll_now()
+
+    def client_connected(self):
+        self._clients += 1
+        self._schedule()
+
+    def client_disconnected(self):
+        self._clients = max(self._clients - 1, 0)
+        if not self._clients:
+            self._idle_after = time.monotonic() + self._idle_delay
+        self._schedule()
+
+    def activity(self):
+        self._active_until = time.monotonic() + self._active_hold
+        self._schedule()
+
+    def ringing(self, ringing: bool):
+        if ringing != self._ringing:
+            self._ringing = ringing
+            if not ringing:
+                self._active_until = time.monotonic() + self._active_hold
+            self._schedule()
+
+    def _desired_rate(self, now: float) -> float:
+        if self._ringing or now < self._active_until:
+            return self._active_rate
+        if self._clients or now < self._idle_after:
+            return self._normal_rate
+        return self._idle_rate
+
+    def _schedule(self):
+        if self._armed:
+            asyncio.create_task(self._apply())
+
+    async def _apply(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self._armed or not self._client.connected:
+            self._armed = False
+            return
+
+        now = time.monotonic()
+        rate = self._desired_rate(now)
+
+        # Re-check when the active hold or the idle grace period runs out.
+        deadlines = [t for t in (self._active_until, self._idle_after) if t > now]
+        if deadlines:
+            self._timer = asyncio.get_running_loop().call_later(
+                min(deadlines) - now, self._schedule)
+
+        if rate == self._rate:
+            return
+
+        waking = self._rate is not None and rate < self._rate
+        logger.info("(%s) AutoPoll rate %s -> %s",
+                    self._client.name, self._rate, rate)
+        self._rate = rate
+
+        await self._client.send(*ChangeGroup.AutoPoll(generate_id(), self._group_id, rate))
+
+        if waking:
+            await self._poll_now()
+
+    async def _poll_now(self):
+        try:
+            result = await self._client.request(
+                *ChangeGroup.Poll(generate_id(), self._group_id))
+        except (QRCError, asyncio.TimeoutError, ConnectionError) as e:
+            logger.warning("(%s) Change group poll failed: %s", self._client.name, e)
+            return
+
+        if isinstance(result, dict):
+            await self._client.emit_change_group(result)
+
+
+POLL_CONTROLLERS: dict[str, AutoPollController] = {}
+
+
+def get_poll_controller(client: QRCClient, group_id: str) -> AutoPollController:
+    if client.name not in POLL_CONTROLLERS:
+        POLL_CONTROLLERS[client.name] = AutoPollController(
+            client,
+            group_id,
+            SETTINGS.poll_rate_idle,
+            SETTINGS.poll_rate_normal,
+            SETTINGS.poll_rate_active,
+            SETTINGS.poll_active_hold,
+            SETTINGS.poll_idle_delay,
+        )
+    return POLL_CONTROLLERS[client.name]
@@ -0,0 +1,124 @@
+import asyncio
+import time
+
+from functools import partial
+from typing import Any, Awaitable, Callable
+
+from ...config import SETTINGS
+from ...metrics import REGISTRY
+
+# (component, control); named controls have an empty component.
+CacheKey = tuple[str, str]
+ControlValue = dict[str, Any]
+FetchFn = Callable[[list[str]], Awaitable[dict[str, ControlValue]]]
+
+LOOKUPS = REGISTRY.counter(
+    "qsys_get_lookups_total",
+    "Control reads for the get command, by how they were answered.",
+    ("result",))
+
+
+def control_value(entry: dict) -> ControlValue:
+    return {
+        "value": entry.get("Value"),
+        "string": entry.get("String"),
+        "position": entry.get("Position"),
+    }
+
+
+class ReadThroughCache:
+    """
+    One core's control values, kept for `ttl` seconds.
+
+    A miss for a control that another caller is already fetching waits on
+    that fetch rather than starting its own, so a burst of identical reads
+    costs the core a single request.
+    """
+
+    def __init__(self, ttl: float):
+        self._ttl = ttl
+        self._values: dict[CacheKey, tuple[float, ControlValue]] = {}
+        self._inflight: dict[CacheKey, asyncio.Future] = {}
+        # Bumped by every invalidation; a fetch that started before one may
+        # have read the old value and is not stored.
+        self._generation = 0
+
+    def put(self, component: str, name: str, value: ControlValue):
+        if self._ttl > 0:
+            self._values[(component, name)] = (time.monotonic() + self._ttl, value)
+
+    def update(self, changes: list[dict]):
+        for change in changes:
+            self.put(change.get("Component", ""), change["Name"], control_value(change))
+
+    def invalidate(self):
+        self._generation += 1
+        self._values.clear()
+        self._inflight.clear()
+
+    async def get(
+        self,
+        component: str,
+        names: list[str],
+        fetch: FetchFn
+    ) -> dict[str, ControlValue]:
+        now = time.monotonic()
+        found: dict[str, ControlValue] = {}
+        waits: dict[asyncio.Future, list[str]] = {}
+        missing: list[str] = []
+
+        for name in dict.fromkeys(names):
+            key = (component, name)
+            cached = self._values.get(key)
+
+            if cached is not None and cached[0] > now:
+                LOOKUPS.inc(result="hit")
+                found[name] = cached[1]
+            elif key in self._inflight:
+                LOOKUPS.inc(result="shared")
+                waits.setdefault(self._inflight[key], []).append(name)
+            else:
+                LOOKUPS.inc(result="miss")
+                missing.append(name)
+
+        if missing:
+            keys = [(component, name) for name in missing]
+            future = asyncio.ensure_future(fetch(missing))
+            for key in keys:
+                self._inflight[key] = future
+            future.add_done_callback(partial(self._fetched, keys, self._generation))
+            waits[future] = missing
+
+        for future, wanted in waits.items():
+            # Shielded so one caller going away does not cancel the read
+            # for everyone else waiting on it.
+            values = await asyncio.shield(future)
+            for name in wanted:
+                if name in values:
+                    found[name] = values[name]
+
+        return {name: found[name] for name in names if name in found}
+
+    def _fetched(self, keys: list[CacheKey], generation: int, future: asyncio.Future):
+        for key in keys:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+        if future.cancelled() or future.exception() is not None:
+            return
+        if generation != self._generation:
+            return
+
+        values = future.result()
+        for component, name in keys:
+            if name in values:
+                self.put(component, name, values[name])
+
+
+READ_CACHES: dict[str, ReadThroughCache] = {}
+
+
+def get_read_cache(core: str) -> ReadThroughCache:
+    if core not in READ_CACHES:
+        READ_CACHES[core] = ReadThroughCache(SETTINGS.get_cache_ttl)
+    return READ_CACHES[core]
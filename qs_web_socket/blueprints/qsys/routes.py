@@ -1,66 +1,59 @@
-from json import dumps
+import time
+
+from functools import partial
+from typing import Any, Awaitable, Callable
+
 from websockets import ClientConnection
 
-from ...server.router import ws_route
-from ...server.dispatcher import CONNECTIONS
+from ...config import SETTINGS
+from ...metrics import REGISTRY
+from ...server.router import ws_route, ws_connect, ws_disconnect
+from ...server.dispatcher import CONNECTIONS, echo_request_id
+from ...server.formats import WireFormat
+from ...server.outbound import OutboundChannel
 from ...drivers.qsc_core_qrc.client import QRCClient
+from ...drivers.qsc_core_qrc.registry import CoreRegistry
 
 from .lights import lights_command
 from .snapshot import snapshot_command
 from .hdmi_select import hdmi_command
 from .dialer import dialer_command
+from .control_get import get_command
+from .change_groups import CHANGE_GROUP_ID
+from .component_map import COMPONENTS
+from .state import get_state
+from .read_cache import get_read_cache
+from .coalescer import UpdateCoalescer
+from .poll_rate import POLL_CONTROLLERS, get_poll_controller
+from .subscriptions import SUBSCRIPTIONS, subscribe_command, unsubscribe_command
+
+POLLS = REGISTRY.counter(
+    "qsys_polls_total", "Change group polls received.", ("core",))
+POLL_SECONDS = REGISTRY.histogram(
+    "qsys_poll_broadcast_seconds",
+    "Time from receiving a poll to its update being sent to each client, including "
+    "any coalescing window and outbound queue wait.",
+    ("core",))
+
+Resolver = Callable[[dict], Any]
+TranslationEntry = tuple[str, str, Resolver]
+# Sinks get the time.monotonic() at which the oldest change in the update
+# was received; the clock is system-wide, so it holds across processes.
+UpdateSink = Callable[[str, dict, float | None], Awaitable[None]]
 
 COMMANDS = {
     "lights": lights_command,
     "system": snapshot_command,
     "inputs": hdmi_command,
-    "dialer": dialer_command
+    "dialer": dialer_command,
+    "get": get_command,
 }
 
-COMPONENT_MAP = {
-    "Input_Controller": {
-        "frontend": "inputs",
-        "controls": {
-            "hdmi.out.1.select.hdmi.1": "input.1",
-            "hdmi.out.1.select.hdmi.2": "input.2",
-            "hdmi.out.1.select.hdmi.3": "input.3",
-        },
-    },
-    "Shades_Controller": {
-        "frontend": "shades",
-        "controls": {
-            "selector.0": "open",
-            "selector.1": "close",
-        },
-    },
-    "Lighting_Controller": {
-        "frontend": "lights",
-        "controls": {
-            "selector.0": "lights.100",
-            "selector.1": "lights.75",
-            "selector.2": "lights.50",
-            "selector.3": "lights.00",
-        },
-    },
-    "System_Controller": {
-        "frontend": "system",
-        "controls": {
-            "load.1": "preset.1",
-            "load.2": "preset.2",
-            "load.3": "preset.3",
-            "load.4": "preset.4",
-        },
-    },
-    "Dialer_Controller": {
-        "frontend": "dialer",
-        "controls": {
-            "call.dnd": "dnd",
-            "call.connect": "connect",
-            "call.disconnect": "disconnect",
-            "call.ringing": "ringing",
-            "call.status": "status",
-        },
-    },
+READ_COMMANDS = {"get"}
+
+SESSION_COMMANDS = {
+    "subscribe": subscribe_command,
+    "unsubscribe": unsubscribe_command,
 }
 
 
@@ -95,38 +88,168 @@ def _resolve_shades_controller(change: dict) -> str:
     return change.get("Value", 0.0) != 0
 
 
-def _resolve_comp_status(change: dict, comp: str) -> str | bool:
-    resolve_map = {
-        "Input_Controller": _resolve_input_controller,
-        "Lighting_Controller": _resolve_simple_on_off,
-        "Shades_Controller": _resolve_shades_controller,
-        "System_Controller": _resolve_simple_on_off
+def _resolve_value(change: dict) -> str:
+    return str(change.get("Value", ""))
+
+
+COMP_RESOLVERS: dict[str, Resolver] = {
+    "Input_Controller": _resolve_input_controller,
+    "Lighting_Controller": _resolve_simple_on_off,
+    "Shades_Controller": _resolve_shades_controller,
+    "System_Controller": _resolve_simple_on_off
+}
+
+
+def _resolver_for(comp: str, name: str) -> Resolver:
+    if comp in COMP_RESOLVERS:
+        return COMP_RESOLVERS[comp]
+    if comp == "Dialer_Controller":
+        return partial(_resolve_dialer, name)
+    return _resolve_value
+
+
+def compile_component_map(component_map: dict) -> dict[tuple[str, str], TranslationEntry]:
+    return {
+        (comp, name): (comp_map["frontend"], frontend_name, _resolver_for(comp, name))
+        for comp, comp_map in component_map.items()
+        for name, frontend_name in comp_map["controls"].items()
+    }
+
+
+TRANSLATION_INDEX = compile_component_map(COMPONENTS)
+FRONTEND_COMPONENTS = {comp_map["frontend"] for comp_map in COMPONENTS.values()}
+
+
+async def _emit_update(key: tuple[str, str], components: dict, received: float):
+    core, group_id = key
+    event = {
+        "type": "change_group_update",
+        "core": core,
+        "id": group_id,
+        "components": components,
     }
 
-    return resolve_map[comp](change)
+    for sink in UPDATE_SINKS:
+        await sink(core, event, received)
+
+
+COALESCER = UpdateCoalescer(SETTINGS.coalesce_window, _emit_update)
 
 
-async def handle_poll(params: dict):
+async def handle_poll(core: str, params: dict):
+    received = time.monotonic()
+    POLLS.inc(core=core)
+
     changes = params["Changes"]
+    get_read_cache(core).update(changes)
     translated = translate_changes(changes)
+    changed = get_state(core).update(translated)
+
+    ringing = translated.get("dialer", {}).get("ringing")
+    if ringing is not None and core in POLL_CONTROLLERS:
+        POLL_CONTROLLERS[core].ringing(ringing == "ringing")
+
+    if changed:
+        await COALESCER.push((core, params["Id"]), changed, received)
+
+
+def _merge_updates(pending: dict, event: dict) -> dict:
+    components = {
+        comp: dict(controls) for comp, controls in pending["components"].items()
+    }
+
+    for comp, controls in event["components"].items():
+        components.setdefault(comp, {}).update(controls)
+
+    return {**event, "components": components}
+
+
+def _observe_sent(core: str, received: float):
+    POLL_SECONDS.observe(time.monotonic() - received, core=core)
+
+
+async def notify_clients(core: str, event: dict, received: float | None = None):
+    merge = _merge_updates if event.get("type") == "change_group_update" else None
+    sent = partial(_observe_sent, core, received) if received is not None else None
+    channels: dict[ClientConnection, OutboundChannel] = CONNECTIONS.get("/qsys", {})
+
+    components: dict = event.get("components") or {}
+    sections = SUBSCRIPTIONS.sections(components)
+    views: dict[frozenset[str] | None, dict] = {None: event}
+    payloads: dict[tuple[WireFormat, frozenset[str] | None], bytes] = {}
+
+    for channel in list(channels.values()):
+        if channel.params.get("core") != core:
+            continue
+
+        if not components or channel not in SUBSCRIPTIONS:
+            key = None
+        else:
+            wanted = sections.get(channel)
+            if not wanted:
+                continue
+            key = frozenset(wanted)
+
+        if key not in views:
+            views[key] = {**event, "components": {c: components[c] for c in key}}
 
-    if translated:
-        await notify_clients({
-            "type": "change_group_update",
-            "id": params["Id"],
-            "components": translated,
-        })
+        # Clients with the same topics and wire format share one payload.
+        payload_key = (channel.format, key)
+        if payload_key not in payloads:
+            payloads[payload_key] = channel.format.encode(views[key])
 
+        channel.put(payloads[payload_key], views[key], merge, sent)
 
-async def notify_clients(event: dict):
-    message = dumps(event)
-    connection_set: set[ClientConnection] = CONNECTIONS.get("/qsys", [])
 
-    for ws in list(connection_set):
-        try:
-            await ws.send(message)
-        except Exception:
-            await ws.close()
+UPDATE_SINKS: list[UpdateSink] = [notify_clients]
+
+
+def _resolve_client(drivers: dict, key: str | None) -> QRCClient | None:
+    registry: CoreRegistry | None = drivers.get(CoreRegistry)
+    return registry.get(key) if registry is not None else None
+
+
+@ws_connect("/qsys")
+async def qsys_connect_handler(channel: OutboundChannel, drivers: dict):
+    key = channel.params.get("core") or channel.params.get("room")
+    client = _resolve_client(drivers, key)
+
+    if client is None:
+        await channel.send({"status": "error", "message": f"unknown core or room: {key}"})
+        await channel.websocket.close()
+        return
+
+    channel.params["core"] = client.name
+    get_poll_controller(client, CHANGE_GROUP_ID).client_connected()
+    _send_snapshot(channel, client.name)
+
+
+def _send_snapshot(channel: OutboundChannel, core: str):
+    components = get_state(core).snapshot()
+    topics = SUBSCRIPTIONS.topics(channel)
+
+    if topics is not None:
+        components = {c: v for c, v in components.items() if c in topics}
+
+    if not components:
+        return
+
+    event = {
+        "type": "change_group_update",
+        "core": core,
+        "id": CHANGE_GROUP_ID,
+        "components": components,
+    }
+    channel.put(channel.format.encode(event), event, _merge_updates)
+
+
+@ws_disconnect("/qsys")
+async def qsys_disconnect_handler(channel: OutboundChannel, _drivers: dict):
+    core = channel.params.get("core")
+    SUBSCRIPTIONS.remove(channel)
+
+    if core in POLL_CONTROLLERS:
+        POLL_CONTROLLERS[core].client_disconnected()
 
 
 @ws_route("/qsys")
@@ -135,53 +258,85 @@ async def qsys_route_handler(
     message: dict,
     drivers: dict
 ):
-    client: QRCClient = drivers.get(QRCClient)
-    cmd = message.get("command", "").lower()
+    channel = CONNECTIONS["/qsys"][websocket]
+    key = message.get("core") or message.get("room") or channel.params.get("core")
+    client = _resolve_client(drivers, key)
+
+    cmd = str(message.get("command", "")).lower()
     qsys_command = COMMANDS.get(cmd)
+    session_command = SESSION_COMMANDS.get(cmd)
+
+    if session_command:
+        success, msg = await session_command(message, channel, FRONTEND_COMPONENTS)
+        response = {
+            "status": "success" if success else "error",
+            "command": cmd,
+            "payload": {"message": msg}
+        }
 
-    if not qsys_command:
+        if success and cmd == "subscribe":
+            await channel.send(echo_request_id(message, response))
+            _send_snapshot(channel, channel.params["core"])
+            return
+    elif not qsys_command:
         response = {"status": "error",
                     "message": f"unknown command: {cmd}"}
+    elif client is None:
+        response = {"status": "error",
+                    "message": f"unknown core or room: {key}"}
     else:
+        if cmd not in READ_COMMANDS:
+            get_poll_controller(client, CHANGE_GROUP_ID).activity()
+
         success, msg = await qsys_command(message, client)
+
+        # Anything that set a control leaves cached reads for the core stale.
+        if success and cmd not in READ_COMMANDS:
+            get_read_cache(client.name).invalidate()
+
         response = {
             "status": "success" if success else "error",
             "command": cmd,
-            "payload": {"message": msg}
+            "payload": msg if isinstance(msg, dict) else {"message": msg}
         }
 
-    await websocket.send(dumps(response))
+    await channel.send(echo_request_id(message, response))
 
 
 def resolve_status(comp: str, name: str, change: dict) -> str:
-    match comp:
-        case "Input_Controller" | "Lighting_Controller" | "Shades_Controller" | "System_Controller":
-            return _resolve_comp_status(change, comp)
-        case "Dialer_Controller":
-            return _resolve_dialer(name, change)
-        case _:
-            return str(change.get("Value", ""))
+    return _resolver_for(comp, name)(change)
+
+
+def _index_entry(comp: str, name: str) -> TranslationEntry | None:
+    comp_map = COMPONENTS.get(comp)
+
+    if not comp_map:
+        return None
+
+    # Controls the map does not name keep their Q-SYS name; index them on
+    # first sight so later polls take the fast path too.
+    entry = (comp_map["frontend"], name, _resolver_for(comp, name))
+    TRANSLATION_INDEX[(comp, name)] = entry
+    return entry
 
 
 def translate_changes(changes: list[dict]) -> dict:
     result: dict[str, dict[str, str]] = {}
 
-    for change in changes:
-        comp = change["Component"]
-        name = change["Name"]
+    index = TRANSLATION_INDEX
 
-        comp_map = COMPONENT_MAP.get(comp)
+    for change in changes:
+        key = (change["Component"], change["Name"])
+        entry = index.get(key) or _index_entry(*key)
 
-        if not comp_map:
+        if entry is None:
             continue
 
-        frontend_comp = comp_map["frontend"]
-        frontend_name = comp_map["controls"].get(name, name)
-
-        status = resolve_status(comp, name, change)
+        frontend_comp, frontend_name, resolver = entry
+        controls = result.get(frontend_comp)
 
-        if frontend_comp not in result:
-            result[frontend_comp] = {}
-        result[frontend_comp][frontend_name] = status
+        if controls is None:
+            controls = result[frontend_comp] = {}
+        controls[frontend_name] = resolver(change)
 
     return result
@@ -21,6 +21,7 @@ from pydantic import BaseModel, ValidationError, field_validator
 from ...drivers.qsc_core_qrc.client import QRCClient
 from ...drivers.qsc_core_qrc.commands import Snapshot
 from .id_generator import generate_id
+from .core_request import core_request
 
 
 class SnapshotPayload(BaseModel):
@@ -55,5 +56,8 @@ async def snapshot_command(message: dict, client: QRCClient) -> tuple[bool, str]
             bank=payload.bank,
         )
 
-    await client.send(*cmd)
+    success, error = await core_request(client, cmd)
+    if not success:
+        return False, error
+
     return True, f"successfully sent snapshot {payload.action} command"
@@ -0,0 +1,39 @@
+from typing import Any
+
+
+class ControlState:
+    def __init__(self):
+        self._components: dict[str, dict[str, Any]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._components)
+
+    def update(self, translated: dict[str, dict[str, Any]]) -> dict[str, dict[str, Any]]:
+        changed: dict[str, dict[str, Any]] = {}
+
+        for comp, controls in translated.items():
+            current = self._components.setdefault(comp, {})
+
+            for name, value in controls.items():
+                if name in current and current[name] == value:
+                    continue
+
+                current[name] = value
+                changed.setdefault(comp, {})[name] = value
+
+        return changed
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {comp: dict(controls) for comp, controls in self._components.items()}
+
+    def clear(self):
+        self._components.clear()
+
+
+STATES: dict[str, ControlState] = {}
+
+
+def get_state(core: str) -> ControlState:
+    if core not in STATES:
+        STATES[core] = ControlState()
+    return STATES[core]
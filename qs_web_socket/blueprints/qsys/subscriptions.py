@@ -0,0 +1,133 @@
+"""
+
+Examples
+--------
+{
+    "command": "subscribe",
+    "payload": {
+        "components": ["dialer", "lights"]
+    }
+}
+
+{
+    "command": "unsubscribe",
+    "payload": {
+        "components": ["lights"]
+    }
+}
+
+Clients that never subscribe receive every component. Unsubscribing
+without a component list goes back to receiving everything.
+
+"""
+
+from typing import Iterable, Optional
+
+from pydantic import BaseModel, ValidationError
+
+from ...server.outbound import OutboundChannel
+
+
+class SubscriptionPayload(BaseModel):
+    components: Optional[list[str]] = None
+
+
+class SubscriptionIndex:
+    def __init__(self):
+        self._by_component: dict[str, set[OutboundChannel]] = {}
+        self._by_channel: dict[OutboundChannel, set[str]] = {}
+
+    def __contains__(self, channel: OutboundChannel) -> bool:
+        return channel in self._by_channel
+
+    def topics(self, channel: OutboundChannel) -> set[str] | None:
+        return self._by_channel.get(channel)
+
+    def subscribe(self, channel: OutboundChannel, components: Iterable[str]):
+        topics = self._by_channel.setdefault(channel, set())
+
+        for component in components:
+            topics.add(component)
+            self._by_component.setdefault(component, set()).add(channel)
+
+    def unsubscribe(self, channel: OutboundChannel, components: Iterable[str]):
+        topics = self._by_channel.get(channel)
+        if topics is None:
+            return
+
+        for component in components:
+            topics.discard(component)
+            self._by_component.get(component, set()).discard(channel)
+
+    def remove(self, channel: OutboundChannel):
+        for component in self._by_channel.pop(channel, set()):
+            self._by_component.get(component, set()).discard(channel)
+
+    def sections(self, components: Iterable[str]) -> dict[OutboundChannel, set[str]]:
+        wanted: dict[OutboundChannel, set[str]] = {}
+
+        for component in components:
+            for channel in self._by_component.get(component, ()):
+                wanted.setdefault(channel, set()).add(component)
+
+        return wanted
+
+
+SUBSCRIPTIONS = SubscriptionIndex()
+
+
+def _parse(message: dict) -> tuple[SubscriptionPayload | None, str]:
+    payload = message.get("payload", {})
+    if not isinstance(payload, dict):
+        return None, "payload must be an object"
+
+    try:
+        return SubscriptionPayload(**payload), ""
+    except ValidationError as e:
+        return None, "; ".join(err["msg"] for err in e.errors())
+
+
+async def subscribe_command(
+    message: dict,
+    channel: OutboundChannel,
+    known: set[str]
+) -> tuple[bool, str]:
+    payload, error = _parse(message)
+    if payload is None:
+        return False, error
+
+    if not payload.components:
+        return False, "components is required to subscribe"
+
+    unknown = sorted(set(payload.components) - known)
+    if unknown:
+        return False, f"unknown components: {', '.join(unknown)}"
+
+    SUBSCRIPTIONS.subscribe(channel, payload.components)
+    return True, f"subscribed to {', '.join(sorted(SUBSCRIPTIONS.topics(channel)))}"
+
+
+async def unsubscribe_command(
+    message: dict,
+    channel: OutboundChannel,
+    known: set[str]
+) -> tuple[bool, str]:
+    payload, error = _parse(message)
+    if payload is None:
+        return False, error
+
+    if payload.components is None:
+        SUBSCRIPTIONS.remove(channel)
+        return True, "subscribed to all components"
+
+    unknown = sorted(set(payload.components) - known)
+    if unknown:
+        return False, f"unknown components: {', '.join(unknown)}"
+
+    # A client that never subscribed receives everything, so its first
+    # unsubscribe starts from every known component.
+    if channel not in SUBSCRIPTIONS:
+        SUBSCRIPTIONS.subscribe(channel, known - set(payload.components))
+    else:
+        SUBSCRIPTIONS.unsubscribe(channel, payload.components)
+    return True, f"unsubscribed from {', '.join(sorted(payload.components))}"
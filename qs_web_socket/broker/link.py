@@ -0,0 +1,99 @@
+import asyncio
+
+from logging import getLogger
+from typing import Any, AsyncIterator
+
+from ..codec import encode, decode
+from ..comms.framer import Framer
+from ..drivers.qsc_core_qrc.priority import DeadlineExceeded
+from ..drivers.qsc_core_qrc.responses import QRCError
+
+TERMINATOR = b"\x00"
+
+logger = getLogger(__name__)
+
+
+class Link:
+    """
+    Null-terminated JSON frames over a broker <-> worker Unix socket.
+
+    Frames are queued and written by a task that waits for the socket to
+    drain. A peer that stops reading fills the queue and is disconnected
+    rather than buffered for without limit.
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        maxsize: int = 10000
+    ):
+        self._reader = reader
+        self._writer = writer
+        self._queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize)
+        self._sender = asyncio.create_task(self._send_loop())
+
+    @property
+    def closing(self) -> bool:
+        return self._writer.is_closing()
+
+    def send(self, message: dict[str, Any]):
+        self.send_frame(encode(message) + TERMINATOR)
+
+    def send_frame(self, frame: bytes):
+        if self._writer.is_closing():
+            return
+
+        try:
+            self._queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            logger.warning("Link peer is not reading; %d frames queued, disconnecting",
+                           self._queue.qsize())
+            self._writer.transport.abort()
+
+    async def _send_loop(self):
+        try:
+            while True:
+                self._writer.write(await self._queue.get())
+                while not self._queue.empty():
+                    self._writer.write(self._queue.get_nowait())
+                await self._writer.drain()
+        except ConnectionError:
+            self._writer.transport.abort()
+
+    async def messages(self) -> AsyncIterator[dict[str, Any]]:
+        framer = Framer(TERMINATOR)
+
+        while chunk := await self._reader.read(65536):
+            for frame in framer.feed(chunk):
+                yield decode(frame)
+
+    async def close(self):
+        self._sender.cancel()
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def dump_error(e: Exception) -> dict[str, Any]:
+    if isinstance(e, QRCError):
+        return {"error": "qrc", "code": e.code, "message": e.message}
+    if isinstance(e, DeadlineExceeded):
+        return {"error": "deadline", "message": str(e)}
+    if isinstance(e, asyncio.TimeoutError):
+        return {"error": "timeout", "message": str(e)}
+    return {"error": "connection", "message": str(e)}
+
+
+def load_error(message: dict[str, Any]) -> Exception:
+    kind = message.get("error")
+
+    if kind == "qrc":
+        return QRCError(message.get("code"), message.get("message", "Unknown error"))
+    if kind == "deadline":
+        return DeadlineExceeded(message.get("message", ""))
+    if kind == "timeout":
+        return asyncio.TimeoutError(message.get("message", ""))
+    return ConnectionError(message.get("message", "broker error"))
@@ -0,0 +1,276 @@
+import asyncio
+import itertools
+import os
+import signal
+import sys
+
+from collections import Counter
+from dataclasses import asdict
+from logging import getLogger
+from typing import Any
+
+from ..codec import DecodeError, encode
+from ..config import SETTINGS
+from ..metrics import REGISTRY, Family
+from ..drivers.qsc_core_qrc.client import QRCClient
+from ..drivers.qsc_core_qrc.priority import Priority
+from ..drivers.qsc_core_qrc.registry import CoreRegistry
+from ..drivers.qsc_core_qrc.templates import PreparedMessage
+from ..blueprints.qsys.change_groups import CHANGE_GROUP_ID
+from ..blueprints.qsys.control_get import fetch_controls
+from ..blueprints.qsys.core_request import REQUEST_ERRORS
+from ..blueprints.qsys.discovery import DISCOVERY, DISCOVERY_SINKS, DesignIndex
+from ..blueprints.qsys.id_generator import generate_id
+from ..blueprints.qsys.poll_rate import get_poll_controller
+from ..blueprints.qsys.read_cache import get_read_cache
+from ..blueprints.qsys.routes import UPDATE_SINKS
+from ..blueprints.qsys.state import get_state
+from .link import TERMINATOR, Link, dump_error
+
+POLL_SIGNALS = ("client_connected", "client_disconnected", "activity")
+# A worker that cannot report its metrics in time is left out of the scrape.
+COLLECT_TIMEOUT = 2.0
+
+logger = getLogger(__name__)
+
+
+class Broker:
+    def __init__(self, path: str, registry: CoreRegistry):
+        self._path = path
+        self._registry = registry
+        self._links: set[Link] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._server: asyncio.AbstractServer | None = None
+        self._collect_ids = itertools.count(1)
+        self._collects: dict[int, asyncio.Future] = {}
+
+    async def start(self):
+        if os.path.exists(self._path):
+            os.unlink(self._path)
+
+        self._server = await asyncio.start_unix_server(self._handle, self._path)
+        UPDATE_SINKS.append(self.publish)
+        DISCOVERY_SINKS.append(self.publish_discovery)
+        logger.info("Broker listening on %s", self._path)
+
+    async def stop(self):
+        if self.publish in UPDATE_SINKS:
+            UPDATE_SINKS.remove(self.publish)
+        if self.publish_discovery in DISCOVERY_SINKS:
+            DISCOVERY_SINKS.remove(self.publish_discovery)
+
+        if self._server is not None:
+            self._server.close()
+
+        for link in list(self._links):
+            await link.close()
+
+        if os.path.exists(self._path):
+            os.unlink(self._path)
+
+    async def publish(self, core: str, event: dict, received: float | None = None):
+        # Encoded once however many workers there are.
+        frame = encode({
+            "op": "update", "core": core, "event": event, "received": received,
+        }) + TERMINATOR
+        for link in self._links:
+            link.send_frame(frame)
+
+    def publish_discovery(self, core: str, index: DesignIndex):
+        frame = encode({"op": "discovery", "core": core, "index": asdict(index)}) + TERMINATOR
+        for link in self._links:
+            link.send_frame(frame)
+
+    async def render_metrics(self) -> str:
+        # The broker's own samples (QRC, polls) plus every worker's, each
+        # under its `worker` label, whichever worker the scrape reached.
+        futures = []
+        for link in self._links:
+            rid = next(self._collect_ids)
+            self._collects[rid] = future = asyncio.get_running_loop().create_future()
+            futures.append((rid, future))
+            link.send({"op": "collect", "rid": rid})
+
+        try:
+            done, _ = await asyncio.wait(
+                [future for _, future in futures], timeout=COLLECT_TIMEOUT)
+        finally:
+            for rid, _ in futures:
+                self._collects.pop(rid, None)
+
+        collected: list[list[Family]] = [future.result() for future in done]
+        return REGISTRY.render(*collected)
+
+    async def _metrics(self, link: Link, message: dict[str, Any]):
+        link.send({"op": "response", "rid": message.get("rid"),
+                   "result": await self.render_metrics()})
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        link = Link(reader, writer, SETTINGS.broker_queue_size)
+        self._links.add(link)
+        clients: Counter[str] = Counter()
+        logger.info("Worker connected to broker")
+
+        for client in self._registry:
+            link.send({
+                "op": "state",
+                "core": client.name,
+                "components": get_state(client.name).snapshot(),
+            })
+            if client.name in DISCOVERY:
+                link.send({"op": "discovery", "core": client.name,
+                           "index": asdict(DISCOVERY[client.name])})
+
+        try:
+            async for message in link.messages():
+                op = message.get("op")
+
+                if op in ("request", "send", "get"):
+                    self._spawn(self._serve(link, message))
+                elif op == "invalidate":
+                    client = self._registry.get(message.get("core"))
+                    if client is not None:
+                        get_read_cache(client.name).invalidate()
+                elif op == "metrics":
+                    self._spawn(self._metrics(link, message))
+                elif op == "collected":
+                    future = self._collects.get(message.get("rid"))
+                    if future is not None and not future.done():
+                        future.set_result(message["families"])
+                elif op == "poll":
+                    self._poll_signal(message, clients)
+        except (ConnectionError, DecodeError) as e:
+            logger.warning("Broker link failed: %s", e)
+        finally:
+            logger.info("Worker disconnected from broker")
+            self._links.discard(link)
+
+            # A worker that goes away takes its WebSocket clients with it.
+            for core, count in clients.items():
+                client = self._registry.get(core)
+                for _ in range(count if client is not None else 0):
+                    get_poll_controller(client, CHANGE_GROUP_ID).client_disconnected()
+
+            await link.close()
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _poll_signal(self, message: dict[str, Any], clients: Counter[str]):
+        client = self._registry.get(message.get("core"))
+        name = message.get("signal")
+
+        if client is None or name not in POLL_SIGNALS:
+            return
+
+        if name == "client_connected":
+            clients[client.name] += 1
+        elif name == "client_disconnected":
+            if not clients[client.name]:
+                return
+            clients[client.name] -= 1
+
+        getattr(get_poll_controller(client, CHANGE_GROUP_ID), name)()
+
+    async def _serve(self, link: Link, message: dict[str, Any]):
+        rid = message.get("rid")
+        client = self._registry.get(message.get("core"))
+
+        if client is None:
+            link.send({"op": "response", "rid": rid, "error": "connection",
+                       "message": f"unknown core: {message.get('core')}"})
+            return
+
+        try:
+            if message["op"] == "get":
+                result = await self._get(client, message)
+            else:
+                result = await self._request(client, message)
+        except REQUEST_ERRORS as e:
+            link.send({"op": "response", "rid": rid, **dump_error(e)})
+            return
+        except Exception:
+            # The worker is still waiting on this rid, whatever went wrong.
+            logger.exception("Broker failed to handle %s", message.get("method") or message["op"])
+            link.send({"op": "response", "rid": rid, "error": "internal",
+                       "message": "the broker failed to handle the request"})
+            return
+
+        if message["op"] != "send":
+            link.send({"op": "response", "rid": rid, "result": result})
+
+    async def _request(self, client: QRCClient, message: dict[str, Any]) -> Any:
+        # Every worker numbers its requests from 1, so ids are reissued here
+        # before they reach the shared core session.
+        method, params = message["method"], {**message["params"], "id": generate_id()}
+        priority = Priority(message.get("priority", Priority.INTERACTIVE))
+        deadline = message.get("deadline")
+
+        if message["op"] == "send":
+            return await client.send(method, params, priority=priority, deadline=deadline)
+
+        if "frame" in message:
+            prepared = PreparedMessage(
+                method, message["params"], message["frame"].encode() + TERMINATOR
+            ).with_id(params["id"])
+            return await client.request_prepared(
+                prepared, message["timeout"], priority, deadline)
+
+        return await client.request(method, params, message["timeout"], priority, deadline)
+
+    async def _get(self, client: QRCClient, message: dict[str, Any]) -> Any:
+        component = message.get("component") or None
+        return await get_read_cache(client.name).get(
+            component or "",
+            message["controls"],
+            lambda names: fetch_controls(client, component, names)
+        )
+
+
+async def _supervise(index: int, stopping: asyncio.Event, processes: dict):
+    while not stopping.is_set():
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "qs_web_socket.broker.worker", str(index))
+        processes[index] = process
+        logger.info("Started WebSocket worker %s (pid %s)", index, process.pid)
+
+        code = await process.wait()
+        if stopping.is_set():
+            break
+
+        logger.warning("WebSocket worker %s exited with %s, restarting", index, code)
+        await asyncio.sleep(1.0)
+
+
+async def run_broker(registry: CoreRegistry, stop_event: asyncio.Event):
+    broker = Broker(SETTINGS.broker_socket, registry)
+    await broker.start()
+
+    stopping = asyncio.Event()
+    processes: dict[int, asyncio.subprocess.Process] = {}
+    supervisors = [
+        asyncio.create_task(_supervise(index, stopping, processes))
+        for index in range(SETTINGS.workers)
+    ]
+
+    try:
+        await stop_event.wait()
+    finally:
+        stopping.set()
+
+        for process in processes.values():
+            if process.returncode is None:
+                process.send_signal(signal.SIGINT)
+
+        for process in processes.values():
+            try:
+                await asyncio.wait_for(process.wait(), 5)
+            except asyncio.TimeoutError:
+                process.kill()
+
+        for task in supervisors:
+            task.cancel()
+
+        await broker.stop()
@@ -0,0 +1,293 @@
+import asyncio
+import itertools
+import signal
+import sys
+
+from http import HTTPStatus
+from logging import getLogger
+from typing import Any
+from urllib.parse import urlsplit
+
+from websockets import ClientConnection, Request, Response, serve
+
+from ..codec import DecodeError
+from ..config import SETTINGS
+from ..logging import configure_logging
+from ..metrics import REGISTRY, label_pair
+from ..drivers import DRIVERS
+from ..drivers.qsc_core_qrc.priority import Priority
+from ..drivers.qsc_core_qrc.registry import CoreRegistry
+from ..drivers.qsc_core_qrc.templates import PreparedMessage
+from ..server.dispatcher import dispatcher, metrics_response, process_request
+from ..server.formats import select_subprotocol
+from ..blueprints.qsys.control_get import FETCH_TIMEOUT
+from ..blueprints.qsys.discovery import DISCOVERY, DesignIndex
+from ..blueprints.qsys.poll_rate import POLL_CONTROLLERS
+from ..blueprints.qsys.read_cache import READ_CACHES, ControlValue, FetchFn
+from ..blueprints.qsys.routes import notify_clients
+from ..blueprints.qsys.state import get_state
+from .link import TERMINATOR, Link, load_error
+
+# Headroom over the request timeout so the broker's own timeout (and its
+# more specific error) wins the race.
+LINK_TIMEOUT_MARGIN = 1.0
+METRICS_TIMEOUT = 5.0
+
+logger = getLogger(__name__)
+
+
+class BrokerConnection:
+    def __init__(self, link: Link, worker: str = ""):
+        self._link = link
+        self._worker = worker
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future] = {}
+        self.closed = asyncio.Event()
+
+    @classmethod
+    async def open(cls, path: str, worker: str = "") -> "BrokerConnection":
+        reader, writer = await asyncio.open_unix_connection(path)
+        return cls(Link(reader, writer, SETTINGS.broker_queue_size), worker)
+
+    @property
+    def connected(self) -> bool:
+        return not self._link.closing and not self.closed.is_set()
+
+    def send(self, message: dict[str, Any]):
+        if not self.connected:
+            raise ConnectionError("broker connection closed")
+        self._link.send(message)
+
+    async def request(self, message: dict[str, Any], timeout: float) -> Any:
+        rid = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[rid] = future
+
+        try:
+            self.send({"op": "request", **message, "rid": rid, "timeout": timeout})
+            return await asyncio.wait_for(future, timeout + LINK_TIMEOUT_MARGIN)
+        finally:
+            self._pending.pop(rid, None)
+
+    def _resolve(self, message: dict[str, Any]):
+        future = self._pending.pop(message.get("rid"), None)
+        if future is None or future.done():
+            return
+
+        if "error" in message:
+            future.set_exception(load_error(message))
+        else:
+            future.set_result(message.get("result"))
+
+    async def run(self):
+        try:
+            async for message in self._link.messages():
+                op = message.get("op")
+
+                if op == "response":
+                    self._resolve(message)
+                elif op == "update":
+                    event = message["event"]
+                    get_state(message["core"]).update(event["components"])
+                    await notify_clients(message["core"], event, message.get("received"))
+                elif op == "state":
+                    state = get_state(message["core"])
+                    state.clear()
+                    state.update(message["components"])
+                elif op == "collect":
+                    self.send({
+                        "op": "collected",
+                        "rid": message["rid"],
+                        "families": REGISTRY.families(label_pair("worker", self._worker)),
+                    })
+                elif op == "discovery":
+                    DISCOVERY[message["core"]] = DesignIndex(**message["index"])
+        except (ConnectionError, DecodeError) as e:
+            logger.warning("Broker link failed: %s", e)
+        finally:
+            self.closed.set()
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("broker connection closed"))
+            self._pending.clear()
+            await self._link.close()
+
+
+class RemoteCoreClient:
+    """
+    Stands in for a QRCClient inside a worker; every call goes to the broker,
+    which owns the real core session.
+    """
+
+    def __init__(self, name: str, broker: BrokerConnection):
+        self._name = name
+        self._broker = broker
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def connected(self) -> bool:
+        return self._broker.connected
+
+    async def request(
+        self,
+        method: str,
+        params: Any,
+        timeout: float = 5.0,
+        priority: Priority = Priority.INTERACTIVE,
+        deadline: float | None = None
+    ) -> Any:
+        return await self._broker.request({
+            "core": self._name,
+            "method": method,
+            "params": params,
+            "priority": int(priority),
+            "deadline": deadline,
+        }, timeout)
+
+    async def request_prepared(
+        self,
+        message: PreparedMessage,
+        timeout: float = 5.0,
+        priority: Priority = Priority.INTERACTIVE,
+        deadline: float | None = None
+    ) -> Any:
+        return await self._broker.request({
+            "core": self._name,
+            "method": message.method,
+            "params": message.params,
+            "frame": message.frame.removesuffix(TERMINATOR).decode(),
+            "priority": int(priority),
+            "deadline": deadline,
+        }, timeout)
+
+    async def send(
+        self,
+        method: str,
+        params: Any,
+        priority: Priority = Priority.INTERACTIVE,
+        deadline: float | None = None
+    ):
+        self._broker.send({
+            "op": "send",
+            "core": self._name,
+            "method": method,
+            "params": params,
+            "priority": int(priority),
+            "deadline": deadline,
+        })
+
+    async def disconnect(self):
+        pass
+
+
+class RemotePollController:
+    def __init__(self, core: str, broker: BrokerConnection):
+        self._core = core
+        self._broker = broker
+
+    def _signal(self, name: str):
+        if self._broker.connected:
+            self._broker.send({"op": "poll", "core": self._core, "signal": name})
+
+    def client_connected(self):
+        self._signal("client_connected")
+
+    def client_disconnected(self):
+        self._signal("client_disconnected")
+
+    def activity(self):
+        self._signal("activity")
+
+    def ringing(self, _ringing: bool):
+        pass
+
+
+class RemoteReadCache:
+    """
+    The broker keeps each core's read cache, fed by its polls, so reads are
+    shared by every worker rather than cached once per worker.
+    """
+
+    def __init__(self, core: str, broker: BrokerConnection):
+        self._core = core
+        self._broker = broker
+
+    def update(self, _changes: list[dict]):
+        pass
+
+    def invalidate(self):
+        if self._broker.connected:
+            self._broker.send({"op": "invalidate", "core": self._core})
+
+    async def get(
+        self,
+        component: str,
+        names: list[str],
+        _fetch: FetchFn
+    ) -> dict[str, ControlValue]:
+        return await self._broker.request({
+            "op": "get",
+            "core": self._core,
+            "component": component,
+            "controls": names,
+        }, FETCH_TIMEOUT)
+
+
+def worker_process_request(broker: BrokerConnection):
+    # A scrape answered by any worker carries the broker's metrics and every
+    # worker's, so it does not matter which one SO_REUSEPORT picked.
+    async def process(connection: ClientConnection, request: Request) -> Response | None:
+        if SETTINGS.metrics_path and urlsplit(request.path).path == SETTINGS.metrics_path:
+            try:
+                body = await broker.request({"op": "metrics"}, METRICS_TIMEOUT)
+            except (asyncio.TimeoutError, ConnectionError):
+                return connection.respond(HTTPStatus.SERVICE_UNAVAILABLE, "broker unavailable\n")
+            return metrics_response(connection, body)
+        return process_request(connection, request)
+
+    return process
+
+
+async def main(worker: str = ""):
+    broker = await BrokerConnection.open(SETTINGS.broker_socket, worker)
+    registry = CoreRegistry()
+
+    for core in SETTINGS.cores:
+        registry.add(RemoteCoreClient(core["name"], broker), core.get("rooms", []))
+        POLL_CONTROLLERS[core["name"]] = RemotePollController(core["name"], broker)
+        READ_CACHES[core["name"]] = RemoteReadCache(core["name"], broker)
+
+    DRIVERS[CoreRegistry] = registry
+    reader = asyncio.create_task(broker.run())
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    # Every worker binds the same port; the kernel spreads new connections
+    # across them.
+    async with serve(
+        dispatcher,
+        SETTINGS.ws_host,
+        SETTINGS.ws_port,
+        process_request=worker_process_request(broker),
+        select_subprotocol=select_subprotocol,
+        reuse_port=True,
+    ):
+        logger.info("WebSocket worker running on ws://%s:%s",
+                    SETTINGS.ws_host, SETTINGS.ws_port)
+        await asyncio.wait(
+            [asyncio.create_task(stop_event.wait()), reader],
+            return_when=asyncio.FIRST_COMPLETED
+        )
+
+    reader.cancel()
+
+
+if __name__ == "__main__":
+    configure_logging()
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else ""))
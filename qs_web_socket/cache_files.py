@@ -0,0 +1,46 @@
+import hashlib
+import json
+import os
+
+from logging import getLogger
+from typing import Any
+
+logger = getLogger(__name__)
+
+
+def cache_path(cache_dir: str, kind: str, key: str | bytes) -> str:
+    if isinstance(key, str):
+        key = key.encode()
+    digest = hashlib.sha256(key).hexdigest()
+    return os.path.join(os.path.expanduser(cache_dir), f"{kind}-{digest}.json")
+
+
+def load_cache(path: str, version: int, **expected: Any) -> dict[str, Any] | None:
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable cache %s: %s", path, e)
+        return None
+
+    if not isinstance(cached, dict) or cached.get("version") != version:
+        return None
+    if any(cached.get(name) != value for name, value in expected.items()):
+        return None
+    return cached
+
+
+def save_cache(path: str, version: int, document: dict[str, Any]):
+    # Written aside and renamed into place, so a process reading the cache
+    # never sees half a file.
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": version, **document}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning("Could not write cache %s: %s", path, e)
@@ -0,0 +1,66 @@
+import json
+
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from .config import SETTINGS
+
+
+@dataclass(frozen=True)
+class JSONCodec:
+    name: str
+    encode: Callable[[Any], bytes]
+    decode: Callable[[bytes | str], Any]
+    decode_error: type[Exception] | tuple[type[Exception], ...]
+
+
+def _orjson_codec() -> JSONCodec:
+    import orjson  # pylint: disable=import-outside-toplevel
+
+    return JSONCodec("orjson", orjson.dumps, orjson.loads, orjson.JSONDecodeError)
+
+
+def _msgspec_codec() -> JSONCodec:
+    import msgspec  # pylint: disable=import-outside-toplevel
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+    return JSONCodec("msgspec", encoder.encode, decoder.decode, msgspec.DecodeError)
+
+
+def _stdlib_codec() -> JSONCodec:
+    encoder = json.JSONEncoder(separators=(",", ":"))
+
+    def _encode_default(obj: Any) -> bytes:
+        return encoder.encode(obj).encode("utf-8")
+
+    return JSONCodec("json", _encode_default, json.loads, json.JSONDecodeError)
+
+
+CODECS: dict[str, Callable[[], JSONCodec]] = {
+    "orjson": _orjson_codec,
+    "msgspec": _msgspec_codec,
+    "json": _stdlib_codec,
+}
+
+
+def load_codec(name: str = "auto") -> JSONCodec:
+    if name != "auto":
+        if name not in CODECS:
+            raise ValueError(f"unknown JSON codec: {name}")
+        return CODECS[name]()
+
+    for factory in CODECS.values():
+        try:
+            return factory()
+        except ImportError:
+            continue
+
+    return _stdlib_codec()
+
+
+CODEC = load_codec(SETTINGS.json_codec)
+
+encode = CODEC.encode
+decode = CODEC.decode
+DecodeError = CODEC.decode_error
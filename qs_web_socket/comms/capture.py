@@ -0,0 +1,136 @@
+"""
+
+Length-prefixed capture of every frame on a TCP connection, for replaying
+real core traffic offline.
+
+A capture file is ``MAGIC`` followed by one record per frame::
+
+    <float64 seconds> <uint8 direction> <uint32 length> <payload>
+
+Times are monotonic seconds since the capture was opened; inbound payloads
+are the framed message without its terminator, outbound payloads are the
+bytes exactly as written.
+
+"""
+
+import asyncio
+import mmap
+import struct
+import time
+import weakref
+
+from typing import BinaryIO, Generator, Iterator
+
+MAGIC = b"QSCAP\x00\x01\x00"
+RECORD = struct.Struct("<dBI")
+
+INBOUND = 0
+OUTBOUND = 1
+
+# Buffered records reach the file at least this often, so a crash loses
+# at most the last second or so of traffic rather than a whole buffer.
+FLUSH_INTERVAL = 1.0
+FLUSH_FRAMES = 256
+
+
+class CaptureError(ValueError):
+    pass
+
+
+class CaptureWriter:
+    def __init__(self, path: str):
+        # Held open for the life of the connection and closed by close().
+        self._file: BinaryIO = open(  # pylint: disable=consider-using-with
+            path, "wb", buffering=1 << 16)
+        self._file.write(MAGIC)
+        self._started = time.monotonic()
+        self._unflushed = 0
+        self._flush_timer: asyncio.TimerHandle | None = None
+
+    def write(self, direction: int, payload: bytes):
+        self._file.write(RECORD.pack(time.monotonic() - self._started, direction, len(payload)))
+        self._file.write(payload)
+
+        self._unflushed += 1
+        if self._unflushed >= FLUSH_FRAMES:
+            self.flush()
+        elif self._flush_timer is None:
+            # The tail of a burst is flushed on a timer rather than by the
+            # next frame, which may not come before the process dies.
+            self._flush_timer = asyncio.get_running_loop().call_later(
+                FLUSH_INTERVAL, self.flush)
+
+    def flush(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        if not self._file.closed:
+            self._file.flush()
+        self._unflushed = 0
+
+    def close(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        if not self._file.closed:
+            self._file.close()
+
+
+class CaptureReader:
+    """
+    Memory-maps a capture file; iterating yields ``(seconds, direction,
+    payload)`` with the payload as a view into the map, so nothing is copied
+    until the caller needs it. A payload is only valid until the iterator is
+    advanced or the reader is closed; copy it with ``bytes()`` to keep it.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._map[:len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise CaptureError(f"{path} is not a QRC capture")
+
+        self._iterators: weakref.WeakSet = weakref.WeakSet()
+
+    def __enter__(self) -> "CaptureReader":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __iter__(self) -> Iterator[tuple[float, int, memoryview]]:
+        records = self._records()
+        self._iterators.add(records)
+        return records
+
+    def _records(self) -> Generator[tuple[float, int, memoryview], None, None]:
+        view = memoryview(self._map)
+        offset = len(MAGIC)
+        end = len(view)
+
+        try:
+            # A record cut short by a crash mid-write ends the capture.
+            while offset + RECORD.size <= end:
+                seconds, direction, length = RECORD.unpack_from(view, offset)
+                offset += RECORD.size
+                if offset + length > end:
+                    break
+
+                # Each payload pins the map until released, so it is
+                # released as soon as the caller moves on.
+                with view[offset:offset + length] as payload:
+                    yield seconds, direction, payload
+                offset += length
+        finally:
+            view.release()
+
+    def close(self):
+        # An iteration abandoned by break or an exception still holds views
+        # on the map, and closing the map under them raises BufferError.
+        for records in list(self._iterators):
+            records.close()
+        self._map.close()
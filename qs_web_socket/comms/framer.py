@@ -0,0 +1,59 @@
+class Framer:
+    def __init__(self, terminator: bytes):
+        if not terminator:
+            raise ValueError("terminator must not be empty")
+
+        self._terminator = terminator
+        self._buffer = bytearray()
+        self._scanned = 0
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        if not self._buffer:
+            return self._feed_chunk(chunk)
+
+        return self._feed_buffer(chunk)
+
+    def _feed_chunk(self, chunk: bytes) -> list[bytes]:
+        # Nothing is carried over, so complete frames are sliced straight out
+        # of the chunk and only the unterminated tail is buffered.
+        frames: list[bytes] = []
+        terminator = self._terminator
+        start = 0
+        end = chunk.find(terminator)
+
+        while end != -1:
+            if end > start:
+                frames.append(chunk[start:end])
+            start = end + len(terminator)
+            end = chunk.find(terminator, start)
+
+        if start < len(chunk):
+            with memoryview(chunk) as view:
+                self._buffer += view[start:]
+            self._scanned = len(self._buffer)
+
+        return frames
+
+    def _feed_buffer(self, chunk: bytes) -> list[bytes]:
+        frames: list[bytes] = []
+        terminator = self._terminator
+        buffer = self._buffer
+        buffer += chunk
+
+        # Bytes before _scanned are known not to start a terminator, so each
+        # byte is searched once no matter how many reads a frame spans.
+        start = 0
+        end = buffer.find(terminator, max(self._scanned - len(terminator) + 1, 0))
+
+        with memoryview(buffer) as view:
+            while end != -1:
+                if end > start:
+                    frames.append(bytes(view[start:end]))
+                start = end + len(terminator)
+                end = buffer.find(terminator, start)
+
+        if start:
+            del buffer[:start]
+        self._scanned = len(buffer)
+
+        return frames
@@ -1,8 +1,16 @@
 import asyncio
+import contextlib
+import random
+import time
 
-from typing import Callable, Optional, Any, Awaitable
+from typing import Callable, Any, Awaitable
 from logging import getLogger
 
+from .capture import INBOUND, OUTBOUND, CaptureWriter
+from .framer import Framer
+
+STABLE_CONNECTION_SECONDS = 1.0
+
 logger = getLogger(__name__)
 
 
@@ -11,27 +19,38 @@ class TCPConnection:
         self,
         host_name: str,
         port: int,
-        reconnect_delay: int = 5,
+        reconnect_delay: float = 0.1,
         auto_reconnect: bool = True,
-        line_terminator: bytes = b'\r\n'
+        line_terminator: bytes = b'\r\n',
+        read_size: int = 65536,
+        reconnect_max_delay: float = 5.0,
+        connect_timeout: float = 3.0,
+        capture_path: str | None = None
     ):
         self._host_name = host_name
         self._port = port
         self._reconnect_delay = reconnect_delay
+        self._reconnect_max_delay = max(reconnect_max_delay, reconnect_delay)
+        self._connect_timeout = connect_timeout
         self._auto_reconnect = auto_reconnect
+        self._read_size = read_size
+        self._capture_path = capture_path
+        self._capture: CaptureWriter | None = None
 
         self._writer: asyncio.StreamReader | None = None
         self._reader: asyncio.StreamReader | None = None
 
         self._connected = asyncio.Event()
-        self._response_lock = asyncio.Lock()
-
         self._stopping = False
         self._line_terminator = line_terminator
 
         self._on_data_callbacks = []
         self._on_status_callbacks = []
 
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
     async def _emit_data(self, message: bytes):
         for cb in self._on_data_callbacks:
             try:
@@ -49,56 +68,98 @@ class TCPConnection:
                         self._host_name, self._port, e)
 
     async def _read_loop(self):
-        buffer = b""
+        framer = Framer(self._line_terminator)
 
         try:
             while not self._reader.at_eof():
-                async with self._response_lock:
-                    chunk = await self._reader.read(1024)
-                    if not chunk:
-                        await asyncio.sleep(0.05)
-                        continue
-
-                    buffer += chunk
-                    while self._line_terminator in buffer:
-                        raw, buffer = buffer.split(self._line_terminator, 1)
-
-                        if not raw:
-                            continue
-
-                        logger.debug("(%s:%s) Received message: %s",
-                             self._host_name, self._port, raw)
-                        await self._emit_data(raw)
+                chunk = await self._reader.read(self._read_size)
+                if not chunk:
+                    await asyncio.sleep(0.05)
+                    continue
+
+                for raw in framer.feed(chunk):
+                    logger.debug("(%s:%s) Received message: %s",
+                         self._host_name, self._port, raw)
+                    if self._capture is not None:
+                        self._capture.write(INBOUND, raw)
+                    await self._emit_data(raw)
         except (asyncio.CancelledError, ConnectionResetError) as e:
             logger.warning("(%s:%s) Read loop ended: %s",
                     self._host_name, self._port, e)
             raise ConnectionError(
                 f"({self._host_name}:{self._port}) Server closed connection") from e
 
+    def _backoff(self, attempt: int) -> float:
+        # The first retry is immediate; after that the delay doubles up to
+        # the cap, jittered so several gateways do not reconnect to a rebooted
+        # core in lockstep.
+        if attempt == 0:
+            return 0.0
+        ceiling = min(self._reconnect_max_delay, self._reconnect_delay * 2 ** (attempt - 1))
+        return random.uniform(ceiling / 2, ceiling)
+
     async def connect(self):
+        attempt = 0
+
+        # One capture spans reconnects, so a dropped session stays on the
+        # same timeline as the traffic around it.
+        if self._capture_path and self._capture is None:
+            self._capture = CaptureWriter(self._capture_path)
+            logger.info("(%s:%s) Capturing traffic to %s",
+                        self._host_name, self._port, self._capture_path)
+
         while not self._stopping:
+            connected_at = None
             try:
                 logger.info("Connecting to %s:%s...", self._host_name, self._port)
-                self._reader, self._writer = await asyncio.open_connection(
-                    self._host_name, self._port
+                self._reader, self._writer = await asyncio.wait_for(
+                    asyncio.open_connection(self._host_name, self._port),
+                    self._connect_timeout
                 )
 
                 self._connected.set()
+                connected_at = time.monotonic()
                 logger.info("Connected to %s:%s!", self._host_name, self._port)
 
                 await self._emit_status(True)
                 await self._read_loop()
-            except (OSError, asyncio.IncompleteReadError, ConnectionError) as e:
-                await self._emit_status(False)
-
-                logger.warning("(%s:%s) Connection error: %s",
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                    ConnectionError) as e:
+                logger.warning("(%s:%s) Connection error: %r",
                         self._host_name, self._port, e)
-                self._connected.clear()
+            else:
+                if not self._stopping:
+                    logger.warning("(%s:%s) Connection closed by the server",
+                            self._host_name, self._port)
 
-                if not self._stopping and self._auto_reconnect:
-                    logger.info("(%s:%s) Reconnecting in %s seconds...",
-                         self._host_name, self._port, self._reconnect_delay)
-                    await asyncio.sleep(self._reconnect_delay)
+            self._connected.clear()
+            await self._close_writer()
+            if connected_at is not None:
+                await self._emit_status(False)
+
+            # Only a connection that stayed up resets the backoff, so a core
+            # that accepts and immediately drops us is not hammered.
+            if connected_at is not None and \
+                    time.monotonic() - connected_at >= STABLE_CONNECTION_SECONDS:
+                attempt = 0
+
+            if self._stopping or not self._auto_reconnect:
+                break
+
+            delay = self._backoff(attempt)
+            attempt += 1
+            logger.info("(%s:%s) Reconnecting in %.2f seconds...",
+                 self._host_name, self._port, delay)
+            await asyncio.sleep(delay)
+
+    async def _close_writer(self):
+        # A stream that hit EOF stays half-open until its socket is closed,
+        # so a dropped session is closed here rather than left to the GC.
+        writer, self._writer = self._writer, None
+        if isinstance(writer, asyncio.StreamWriter):
+            writer.close()
+            with contextlib.suppress(OSError):
+                await writer.wait_closed()
 
     async def disconnect(self):
         self._stopping = True
@@ -108,6 +169,10 @@ class TCPConnection:
             self._writer.close()
             await self._writer.wait_closed()
 
+        if self._capture is not None:
+            self._capture.close()
+            self._capture = None
+
         logger.info("(%s:%s) Disconnected", self._host_name, self._port)
 
     def on_data(
@@ -122,58 +187,29 @@ class TCPConnection:
         self._on_status_callbacks.append(func)
         return func
 
-    async def send(
-        self,
-        data: bytes | str,
-        encoding: str = "utf-8",
-        wait_for_response: bool = False,
-        timeout: float = 5.0,
-        line_terminator: Optional[bytes] = None
-    ) -> Optional[bytes]:
+    async def send_many(self, frames: list[bytes]):
+        await self._connected.wait()
+
+        if self._writer and isinstance(self._writer, asyncio.StreamWriter):
+            if self._capture is not None:
+                for frame in frames:
+                    self._capture.write(OUTBOUND, frame)
+
+            self._writer.writelines(frames)
+            await self._writer.drain()
+            logger.debug("(%s:%s) Sent %s frames: %s",
+                         self._host_name, self._port, len(frames), frames)
+
+    async def send(self, data: bytes | str, encoding: str = "utf-8"):
         await self._connected.wait()
 
         if self._writer and isinstance(self._writer, asyncio.StreamWriter):
             if not isinstance(data, bytes):
                 data = data.encode(encoding=encoding)
 
-            if wait_for_response:
-                async with self._response_lock:
-                    self._writer.write(data)
-                    await self._writer.drain()
-                    logger.debug("(%s:%s) Sent: %s", self._host_name, self._port, data)
-
-                    line_terminator = (
-                        self._line_terminator if line_terminator
-                        is None else line_terminator
-                    )
-
-                    buffer = b""
-                    try:
-                        while True:
-                            chunk = await asyncio.wait_for(
-                                self._reader.read(1024), timeout=timeout
-                            )
-
-                            if not chunk:
-                                await asyncio.sleep(0.05)
-                                continue
-
-                            buffer += chunk
-
-                            if line_terminator in buffer:
-                                raw, buffer = buffer.split(
-                                    self._line_terminator, 1)
-                                if not raw:
-                                    continue
-                                return raw
-
-                    except asyncio.TimeoutError:
-                        logger.warning("(%s:%s) Response timed out for %s",
-                                self._host_name, self._port, data)
-                        return None
-            else:
-                self._writer.write(data)
-                await self._writer.drain()
-                logger.debug("(%s:%s) Sent: %s", self._host_name, self._port, data)
+            if self._capture is not None:
+                self._capture.write(OUTBOUND, data)
 
-        return None
+            self._writer.write(data)
+            await self._writer.drain()
+            logger.debug("(%s:%s) Sent: %s", self._host_name, self._port, data)
@@ -0,0 +1,89 @@
+import json
+import os
+
+from dataclasses import dataclass, field, fields
+from typing import Any
+
+CONFIG_ENV = "QS_WS_CONFIG"
+ENV_PREFIX = "QS_WS_"
+
+
+def _default_cores() -> list[dict[str, Any]]:
+    return [{"name": "QSYS Core 110f", "host": "127.0.0.1", "port": 1710, "rooms": []}]
+
+
+def _default_ws_formats() -> list[str]:
+    return ["json", "msgpack", "cbor"]
+
+
+def _default_log_rate_limits() -> dict[str, float]:
+    return {
+        "qs_web_socket.comms.tcp_client": 20.0,
+        "qs_web_socket.drivers.qsc_core_qrc.client": 20.0,
+        "qs_web_socket.server.dispatcher": 20.0,
+    }
+
+
+@dataclass
+class Settings:
+    cores: list[dict[str, Any]] = field(default_factory=_default_cores)
+    ws_host: str = "127.0.0.1"
+    ws_port: int = 8765
+    metrics_path: str = "/metrics"
+    ws_formats: list[str] = field(default_factory=_default_ws_formats)
+    ws_compression: dict[str, Any] = field(default_factory=dict)
+    poll_rate_idle: float = 30.0
+    poll_rate_normal: float = 3.0
+    poll_rate_active: float = 0.25
+    poll_active_hold: float = 10.0
+    poll_idle_delay: float = 30.0
+    outbound_queue_size: int = 64
+    slow_consumer_policy: str = "drop_oldest"
+    json_codec: str = "auto"
+    coalesce_window: float = 0.0
+    command_deadline: float = 2.0
+    bulk_batch_size: int = 32
+    reconnect_delay: float = 0.1
+    reconnect_max_delay: float = 5.0
+    connect_timeout: float = 3.0
+    capture_file: str = ""
+    max_inflight: int = 8
+    get_cache_ttl: float = 2.0
+    workers: int = 0
+    broker_socket: str = "/tmp/qs_web_socket.sock"
+    broker_queue_size: int = 10000
+    log_level: str = "INFO"
+    log_queue_size: int = 10000
+    log_rate_limits: dict[str, float] = field(default_factory=_default_log_rate_limits)
+    design_file: str = "qsys_conf_system_v_1_0_0.qsys"
+    design_cache_dir: str = "~/.cache/qs_web_socket"
+    discovery: bool = True
+    discovery_timeout: float = 30.0
+
+
+def _coerce(value: str, type_: Any) -> Any:
+    if type_ is bool:
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    if type_ in (int, float, str):
+        return type_(value)
+    return json.loads(value)
+
+
+def load_settings(path: str | None = None) -> Settings:
+    values: dict[str, Any] = {}
+    path = path or os.environ.get(CONFIG_ENV)
+
+    if path:
+        with open(path, encoding="utf-8") as f:
+            values.update(json.load(f))
+
+    for setting in fields(Settings):
+        env_value = os.environ.get(ENV_PREFIX + setting.name.upper())
+        if env_value is not None:
+            values[setting.name] = _coerce(env_value, setting.type)
+
+    known = {setting.name for setting in fields(Settings)}
+    return Settings(**{k: v for k, v in values.items() if k in known})
+
+
+SETTINGS = load_settings()
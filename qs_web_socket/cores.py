@@ -0,0 +1,52 @@
+from .config import SETTINGS
+from .drivers.qsc_core_qrc.client import QRCClient
+from .drivers.qsc_core_qrc.registry import CORES, CoreRegistry
+
+from .blueprints.qsys.routes import handle_poll
+from .blueprints.qsys.change_groups import register_change_group
+from .blueprints.qsys.discovery import refresh_discovery
+
+
+def create_client(core: dict) -> QRCClient:
+    client = QRCClient(
+        core["host"],
+        auto_reconnect=True,
+        name=core["name"],
+        port=core.get("port", 1710),
+        bulk_batch_size=SETTINGS.bulk_batch_size,
+        reconnect_delay=SETTINGS.reconnect_delay,
+        reconnect_max_delay=SETTINGS.reconnect_max_delay,
+        connect_timeout=SETTINGS.connect_timeout,
+        capture_path=SETTINGS.capture_file.format(core=core["name"]) or None
+    )
+
+    @client.on_connect
+    async def __setup(client: QRCClient) -> None:
+        await register_change_group(client)
+
+    if SETTINGS.discovery:
+        @client.on_connect
+        async def __discover(client: QRCClient) -> None:
+            await refresh_discovery(client)
+
+    @client.on_change_group
+    async def __handle_poll(payload: dict) -> None:
+        await handle_poll(client.name, payload)
+
+    client.initialize()
+    return client
+
+
+def start_cores() -> CoreRegistry:
+    # Every core opens its capture with "wb"; sharing one path would have
+    # them overwrite each other.
+    if SETTINGS.capture_file and len(SETTINGS.cores) > 1 \
+            and "{core}" not in SETTINGS.capture_file:
+        raise ValueError("capture_file must contain {core} when several cores are configured")
+
+    for core in SETTINGS.cores:
+        client = create_client(core)
+        CORES.add(client, core.get("rooms", []))
+        client.connect()
+
+    return CORES
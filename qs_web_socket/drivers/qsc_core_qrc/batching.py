@@ -0,0 +1,65 @@
+from typing import Any
+
+from .templates import PreparedMessage
+
+QueuedMessage = tuple[str, dict[str, Any]] | PreparedMessage | bytes
+
+
+def _set_key(params: dict[str, Any]) -> tuple[str, Any]:
+    return params["params"]["Name"], params["params"].get("ResponseValues")
+
+
+def _unpack(message: QueuedMessage) -> tuple[str, dict[str, Any]] | None:
+    if isinstance(message, bytes):
+        return None
+    if isinstance(message, PreparedMessage):
+        return message.method, message.params
+    return message
+
+
+def batch_messages(
+    messages: list[QueuedMessage]
+) -> tuple[list[QueuedMessage], dict[int, list[int]]]:
+    batched: list[QueuedMessage] = []
+    merged_ids: dict[int, list[int]] = {}
+    # Key of the Set at the end of ``batched``, if that is what it ends with.
+    open_set: tuple[str, Any] | None = None
+
+    for message in messages:
+        unpacked = _unpack(message)
+        if unpacked is None or unpacked[0] != "Component.Set":
+            open_set = None
+            batched.append(message)
+            continue
+
+        method, params = unpacked
+        key = _set_key(params)
+        controls = params["params"]["Controls"]
+
+        # Only the most recent message can absorb a Set, so ordering against
+        # anything in between (another component's Set included) is kept, and
+        # a control already in the merged call starts a new one so repeated
+        # presses of the same button are all delivered.
+        if key == open_set:
+            _, target = _unpack(batched[-1])
+            target_controls = target["params"]["Controls"]
+            names = {control["Name"] for control in target_controls}
+
+            if not any(control["Name"] in names for control in controls):
+                # Copy on first merge so the caller's (or a template's) params
+                # are never mutated; until then the message is sent as is.
+                if target["id"] not in merged_ids:
+                    target = {
+                        **target,
+                        "params": {**target["params"], "Controls": list(target_controls)},
+                    }
+                    batched[-1] = (method, target)
+
+                target["params"]["Controls"].extend(controls)
+                merged_ids.setdefault(target["id"], []).append(params["id"])
+                continue
+
+        open_set = key
+        batched.append(message)
+
+    return batched, merged_ids
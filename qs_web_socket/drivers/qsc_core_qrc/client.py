@@ -1,17 +1,40 @@
 import asyncio
+import time
 
-from json import dumps
 from typing import Any, Callable, Awaitable
 from logging import getLogger
 
+from ...codec import encode
 from ...comms.tcp_client import TCPConnection
+from ...metrics import REGISTRY
 
+from .batching import QueuedMessage, batch_messages
+from .priority import DeadlineExceeded, Priority, PriorityLanes, QueuedItem
+from .templates import PreparedMessage
 from .commands import Connection
-from .responses import parse_response
+from .responses import parse_response, QRCError
 
 SetupFn = Callable[["QRCClient"], Awaitable[None]]
 ChangeGroupHandler = Callable[[dict], Awaitable[None]]
-OnClientConnect = Callable[["QRCClient"], Awaitable[None]]
+
+HEARTBEAT_ID = "heartbeat"
+
+QUEUE_DEPTH = REGISTRY.gauge(
+    "qrc_queue_depth", "Messages waiting in the QRC send queue.", ("core",))
+SEND_SECONDS = REGISTRY.histogram(
+    "qrc_send_seconds", "Time to write and drain one batch to the core.", ("core",))
+MESSAGES_SENT = REGISTRY.counter(
+    "qrc_messages_sent_total", "Frames written to the core.", ("core",))
+HEARTBEAT_SECONDS = REGISTRY.histogram(
+    "qrc_heartbeat_rtt_seconds", "Heartbeat NoOp round trip time.", ("core",))
+HEARTBEAT_FAILURES = REGISTRY.counter(
+    "qrc_heartbeat_failures_total", "Heartbeats that failed or timed out.", ("core",))
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "qrc_queue_wait_seconds", "Time a message waited in the QRC send queue.",
+    ("core", "priority"))
+DEADLINE_DROPS = REGISTRY.counter(
+    "qrc_deadline_drops_total", "Messages dropped after waiting past their deadline.",
+    ("core", "priority"))
 
 logger = getLogger(__name__)
 
@@ -21,29 +44,54 @@ class QRCClient:
         self,
         host_name: str,
         auto_reconnect: bool = True,
-        name: str = "QSYS Core 110f"
+        name: str = "QSYS Core 110f",
+        read_size: int = 65536,
+        port: int = 1710,
+        bulk_batch_size: int = 32,
+        reconnect_delay: float = 0.1,
+        reconnect_max_delay: float = 5.0,
+        connect_timeout: float = 3.0,
+        capture_path: str | None = None
     ):
         self._host_name = host_name
         self._auto_reconnect = auto_reconnect
         self._name = name
+        self._bulk_batch_size = max(bulk_batch_size, 1)
 
         self._tcp_client = TCPConnection(
             self._host_name,
-            1710,
+            port,
             auto_reconnect=self._auto_reconnect,
-            line_terminator=b"\x00"
+            line_terminator=b"\x00",
+            read_size=read_size,
+            reconnect_delay=reconnect_delay,
+            reconnect_max_delay=reconnect_max_delay,
+            connect_timeout=connect_timeout,
+            capture_path=capture_path
         )
 
         self._heartbeat_task: asyncio.Task | None = None
         self._connect_task: asyncio.Task | None = None
         self._queue_worker_task: asyncio.Task | None = None
-        self._queue: asyncio.Queue[bytes] = asyncio.Queue()
+        self._queue = PriorityLanes()
+        self._pending: dict[int | str, asyncio.Future] = {}
+        self._merged_ids: dict[int, list[int]] = {}
 
         self._setup_hooks: list[SetupFn] = []
         self._change_group_handlers: list[ChangeGroupHandler] = []
-        self._client_connect_handlers: list[OnClientConnect] = []
 
         self._subscribed = False
+        self._heartbeat = self._format_message(*Connection.NoOp(HEARTBEAT_ID))
+
+        QUEUE_DEPTH.track(self._queue.qsize, core=self._name)
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def connected(self) -> bool:
+        return self._tcp_client.connected
 
     def _connection_changed(self, connected: bool):
         if connected:
@@ -65,17 +113,36 @@ class QRCClient:
                 self._queue_worker_task.cancel()
                 self._queue_worker_task = None
 
+            self._fail_pending(ConnectionError(
+                f"({self._name}) Connection to core lost"))
+
+    def _fail_pending(self, exc: Exception):
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(exc)
+        self._pending.clear()
+        self._merged_ids.clear()
+
     def _format_message(self, method: str, params: dict[str, Any]) -> bytes:
-        message = {"jsonrpc": "2.0", "method": method, **params}
-        return dumps(message).encode("utf-8") + b"\x00"
+        return encode({"jsonrpc": "2.0", "method": method, **params}) + b"\x00"
 
     def _msg_received(self, data: bytes):
         status, payload = parse_response(data, self._name)
 
         if status is not None:
+            id_ = payload.get("id")
+            futures = [
+                self._pending.pop(i, None)
+                for i in (id_, *self._merged_ids.pop(id_, ()))
+            ]
+            futures = [f for f in futures if f is not None and not f.done()]
+
             if status == "result":
-                logger.info("(%s) Result: %s",
-                            self._name, payload)
+                logger.debug("(%s) Result: %s",
+                             self._name, payload)
+
+                for future in futures:
+                    future.set_result(payload.get("result"))
 
                 method = payload.get("method", "")
 
@@ -86,21 +153,77 @@ class QRCClient:
                 logger.error("(%s) logger.error: %s",
                              self._name, payload)
 
+                for future in futures:
+                    future.set_exception(QRCError(
+                        payload.get("code"),
+                        payload.get("message", "Unknown error")))
+
     async def _send_heartbeat(self):
         while True:
             if self._queue.empty():
-                await self._queue.put(self._format_message(*Connection.NoOp()))
+                started = time.perf_counter()
+                try:
+                    await self._request(
+                        HEARTBEAT_ID, self._heartbeat, 10.0, Priority.HEARTBEAT)
+                    HEARTBEAT_SECONDS.observe(
+                        time.perf_counter() - started, core=self._name)
+                except (asyncio.TimeoutError, QRCError, ConnectionError) as e:
+                    HEARTBEAT_FAILURES.inc(core=self._name)
+                    logger.warning("(%s) Heartbeat failed: %r", self._name, e)
             await asyncio.sleep(15)
 
+    def _frame(self, message: QueuedMessage) -> bytes:
+        if isinstance(message, bytes):
+            return message
+        if isinstance(message, PreparedMessage):
+            return message.frame
+        return self._format_message(*message)
+
+    def _drop_expired(self, item: QueuedItem, now: float):
+        priority = item.priority.name.lower()
+        DEADLINE_DROPS.inc(core=self._name, priority=priority)
+        logger.warning("(%s) Dropped %s message after %.3fs in queue",
+                       self._name, priority, now - item.enqueued)
+
+        if item.future is not None:
+            item.future.set_exception(DeadlineExceeded(
+                f"({self._name}) command waited {now - item.enqueued:.3f}s "
+                "in queue and was dropped"))
+
+    def _ready_messages(self, items: list[QueuedItem]) -> list[QueuedMessage]:
+        now = time.monotonic()
+        messages = []
+
+        for item in items:
+            if item.abandoned:
+                continue
+            if item.expired(now):
+                self._drop_expired(item, now)
+                continue
+
+            QUEUE_WAIT_SECONDS.observe(
+                now - item.enqueued, core=self._name, priority=item.priority.name.lower())
+            messages.append(item.message)
+
+        return messages
+
     async def _queue_worker(self):
         while True:
-            message = await self._queue.get()
+            await self._queue.wait()
+            messages = self._ready_messages(self._queue.take(self._bulk_batch_size))
+            if not messages:
+                continue
+
             try:
-                await self._tcp_client.send(message)
+                batched, merged_ids = batch_messages(messages)
+                self._merged_ids.update(merged_ids)
+
+                started = time.perf_counter()
+                await self._tcp_client.send_many([self._frame(m) for m in batched])
+                SEND_SECONDS.observe(time.perf_counter() - started, core=self._name)
+                MESSAGES_SENT.inc(len(batched), core=self._name)
             except Exception as e:
                 logger.info("(%s) Failed to send message: %s", self._name, e)
-            finally:
-                self._queue.task_done()
 
     def connect(self):
         self._connect_task = asyncio.create_task(self._tcp_client.connect())
@@ -117,6 +240,9 @@ class QRCClient:
             self._queue_worker_task.cancel()
             self._queue_worker_task = None
 
+        self._fail_pending(ConnectionError(
+            f"({self._name}) Client disconnected"))
+
         await self._tcp_client.disconnect()
 
     def initialize(self):
@@ -136,14 +262,84 @@ class QRCClient:
         self._change_group_handlers.append(fn)
         return fn
 
-    def on_ws_client_connected(self, fn):
-        self._client_connect_handlers.append(fn)
-        return fn
+    async def emit_change_group(self, params: dict):
+        for handler in self._change_group_handlers:
+            await handler(params)
+
+    def _deadline(self, deadline: float | None) -> float | None:
+        return time.monotonic() + deadline if deadline is not None else None
+
+    async def send(
+        self,
+        method: str,
+        params: dict[str, Any],
+        priority: Priority = Priority.INTERACTIVE,
+        deadline: float | None = None
+    ):
+        self._queue.put(QueuedItem((method, params), priority, self._deadline(deadline)))
 
-    async def ws_client_connected(self):
-        for handler in self._client_connect_handlers:
-            await handler(self)
+    async def request(
+        self,
+        method: str,
+        params: dict[str, Any],
+        timeout: float = 5.0,
+        priority: Priority = Priority.INTERACTIVE,
+        deadline: float | None = None
+    ) -> Any:
+        id_ = params.get("id")
+        if id_ is None:
+            raise ValueError(f"({self._name}) {method} request requires an id")
+
+        return await self._request(id_, (method, params), timeout, priority, deadline)
+
+    async def request_batch(
+        self,
+        messages: list[tuple[str, dict[str, Any]]],
+        timeout: float = 5.0,
+        priority: Priority = Priority.BULK
+    ) -> list[Any]:
+        # Every message is queued before any reply is awaited, so the batch
+        # goes out in as few writes as the queue allows. Failures are returned
+        # in place rather than raised.
+        return await asyncio.gather(
+            *(self._request(params["id"], (method, params), timeout, priority)
+              for method, params in messages),
+            return_exceptions=True
+        )
 
-    async def send(self, method: str, params: dict[str, Any]):
-        message: bytes = self._format_message(method, params)
-        await self._queue.put(message)
+    async def request_prepared(
+        self,
+        message: PreparedMessage,
+        timeout: float = 5.0,
+        priority: Priority = Priority.INTERACTIVE,
+        deadline: float | None = None
+    ) -> Any:
+        return await self._request(message.params["id"], message, timeout, priority, deadline)
+
+    async def _request(
+        self,
+        id_: int | str,
+        message: QueuedMessage,
+        timeout: float,
+        priority: Priority = Priority.INTERACTIVE,
+        deadline: float | None = None
+    ) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._pending[id_] = future
+
+        try:
+            self._queue.put(QueuedItem(message, priority, self._deadline(deadline), future))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(id_, None)
+            if self._merged_ids:
+                self._forget_merged(id_)
+
+    def _forget_merged(self, id_: int | str):
+        # A merged Set the core never answers is dropped once none of the
+        # requests folded into it is still waiting.
+        for lead, ids in list(self._merged_ids.items()):
+            if lead != id_ and id_ not in ids:
+                continue
+            if not any(i in self._pending for i in (lead, *ids)):
+                del self._merged_ids[lead]
@@ -1,5 +1,5 @@
 from .change_group import ChangeGroup
-from .mixer import Mixer, ALL, NONE, ChannelSpec
+from .mixer import Mixer, ALL, NONE, ChannelSpec, crosspoint_blocks
 from .loop_player import LoopPlayer
 from .snapshot import Snapshot
 from .component import Component
@@ -47,7 +47,7 @@ class ChangeGroup:
     def AutoPoll(
         id_: int,
         group_id: str,
-        rate: int,
+        rate: float,
     ) -> tuple[str, dict]:
         payload_params = {
             "id": id_,
@@ -11,6 +11,10 @@ class Connection:
         return "Logon", payload_params
 
     @staticmethod
-    def NoOp() -> tuple[str, dict]:
+    def NoOp(id_: int | str | None = None) -> tuple[str, dict]:
         payload_params = {}
+
+        if id_ is not None:
+            payload_params["id"] = id_
+
         return "NoOp", payload_params
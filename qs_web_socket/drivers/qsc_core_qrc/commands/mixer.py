@@ -1,4 +1,4 @@
-from typing import Iterable, Literal
+from typing import Any, Callable, Iterable, Literal
 
 
 class ChannelSpec:
@@ -33,7 +33,13 @@ def _format_channel_spec(spec: int | Iterable[int]) -> str:
     if isinstance(spec, int):
         return str(spec)
 
-    values = sorted(set(list(spec)))
+    if isinstance(spec, range) and spec.step == 1:
+        return _format_sorted_channels(spec)
+
+    return _format_sorted_channels(sorted(set(spec)))
+
+
+def _format_sorted_channels(values: list[int] | range) -> str:
     if not values:
         return ""
 
@@ -68,6 +74,74 @@ def _normalize_channels(ch: ChannelSpec | int | list[int] | range | Literal["*"]
     return str(ch)
 
 
+CrossPointBlock = tuple[list[int], list[int], Any]
+
+
+def _numpy() -> Any:
+    try:
+        import numpy  # pylint: disable=import-outside-toplevel
+    except ImportError as e:
+        raise ImportError("crosspoint matrix commands need the numpy package") from e
+    return numpy
+
+
+def _value_blocks(mask: Any, value: Any) -> list[CrossPointBlock]:
+    np = _numpy()
+
+    rows = np.flatnonzero(mask.any(axis=1))
+    if not rows.size:
+        return []
+
+    # Inputs whose rows select the same outputs share one command.
+    patterns, inverse = np.unique(mask[rows], axis=0, return_inverse=True)
+    return [
+        ((rows[inverse.ravel() == k] + 1).tolist(),
+         (np.flatnonzero(pattern) + 1).tolist(),
+         value)
+        for k, pattern in enumerate(patterns)
+    ]
+
+
+def crosspoint_blocks(matrix: Any, current: Any = None) -> list[CrossPointBlock]:
+    """
+    Split an inputs x outputs matrix into (inputs, outputs, value) blocks.
+
+    Every block sets the same value on the cross product of its 1-based
+    input and output channels, so each one is a single Mixer command. Blocks
+    never overlap and only ever write a cell's target value, so a live mixer
+    passes through no intermediate state and they can be sent in any order.
+    Given the matrix currently on the core only changed cells are emitted;
+    otherwise every cell is. Requires NumPy.
+    """
+    np = _numpy()
+
+    matrix = np.asarray(matrix)
+    if matrix.ndim != 2:
+        raise ValueError(f"expected a 2-D inputs x outputs matrix, got {matrix.ndim}-D")
+    if matrix.dtype.kind in "fc" and np.isnan(matrix).any():
+        raise ValueError("crosspoint matrix contains NaN")
+    if matrix.size == 0:
+        return []
+
+    if current is None:
+        pending = np.ones(matrix.shape, dtype=bool)
+    else:
+        current = np.asarray(current)
+        if current.shape != matrix.shape:
+            raise ValueError(f"current matrix {current.shape} does not match {matrix.shape}")
+        pending = matrix != current
+
+    by_input: list[CrossPointBlock] = []
+    by_output: list[CrossPointBlock] = []
+
+    for value in np.unique(matrix[pending]):
+        mask = pending & (matrix == value)
+        by_input += _value_blocks(mask, value.item())
+        by_output += [(i, o, v) for o, i, v in _value_blocks(mask.T, value.item())]
+
+    return min(by_input, by_output, key=len)
+
+
 class Mixer:
     @staticmethod
     def SetCrossPointDelay(
@@ -130,6 +204,37 @@ class Mixer:
         }
         return "Mixer.SetCrossPointMute", payload_params
 
+    @staticmethod
+    def SetCrossPointGainMatrix(
+        next_id: Callable[[], int],
+        name: str,
+        gains: Any,
+        ramp: float = 0.0,
+        current: Any = None,
+    ) -> list[tuple[str, dict]]:
+        return [
+            Mixer.SetCrossPointGain(
+                next_id(), name,
+                _format_sorted_channels(inputs), _format_sorted_channels(outputs),
+                value, ramp)
+            for inputs, outputs, value in crosspoint_blocks(gains, current)
+        ]
+
+    @staticmethod
+    def SetCrossPointMuteMatrix(
+        next_id: Callable[[], int],
+        name: str,
+        mutes: Any,
+        current: Any = None,
+    ) -> list[tuple[str, dict]]:
+        return [
+            Mixer.SetCrossPointMute(
+                next_id(), name,
+                _format_sorted_channels(inputs), _format_sorted_channels(outputs),
+                bool(value))
+            for inputs, outputs, value in crosspoint_blocks(mutes, current)
+        ]
+
     @staticmethod
     def SetCrossPointSolo(
         id_: int,
@@ -0,0 +1,109 @@
+"""
+Reader for Q-SYS Designer (.qsys) design files.
+
+A design file is a small BinaryFormatter header followed by a gzip stream
+holding the serialized design document. `read_design` pulls out every named
+component with its type and control names, using the names QRC expects
+(`call_dnd` in the file is `call.dnd` on the wire). Controls a script
+component's author named are kept as written.
+
+Parsing a large design is slow, so `load_design` caches the result as JSON
+under the SHA-256 of the file content; an unchanged file is never parsed
+twice.
+
+Examples:
+    components = load_design("room.qsys", cache_dir="~/.cache/qs_web_socket")
+    components["Dialer_Controller"]
+    # {"type": "softphone", "controls": ["call.dnd", "call.number", ...]}
+"""
+import zlib
+
+from typing import Any
+
+from ....cache_files import cache_path, load_cache, save_cache
+from .nrbf import NRBFError, NRBFReader, Record
+
+DesignComponents = dict[str, dict[str, Any]]
+
+CACHE_VERSION = 2
+
+# Every script component has a `code` control holding its source; its
+# built-in controls start with `script_`, the rest are named by the author.
+SCRIPT_SOURCE_CONTROL = "code"
+SCRIPT_CONTROL_PREFIX = "script_"
+
+
+def _control_names(reader: NRBFReader, values: Any) -> list[str]:
+    values = reader.resolve(values)
+    if not isinstance(values, Record):
+        return []
+
+    pairs = reader.resolve(values.get("KeyValuePairs")) or []
+    names = [reader.resolve(reader.resolve(pair)["key"]) for pair in pairs]
+    names = [name for name in names if isinstance(name, str)]
+
+    # The file stores the `.` of a built-in control name as `_`; an
+    # underscore in an author-named control is part of the name.
+    scripted = SCRIPT_SOURCE_CONTROL in names
+    return [
+        name if scripted and not name.startswith(SCRIPT_CONTROL_PREFIX)
+        else name.replace("_", ".")
+        for name in names
+    ]
+
+
+def read_design(data: bytes) -> DesignComponents:
+    header = NRBFReader(data)
+    header.read_stream()
+
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    try:
+        document = decompressor.decompress(data[header.offset:])
+    except zlib.error as e:
+        raise NRBFError(f"design body is not gzip compressed: {e}") from e
+
+    # A truncated body decompresses without error into part of the design.
+    if not decompressor.eof:
+        raise NRBFError("design body is truncated")
+
+    reader = NRBFReader(document)
+    reader.read_stream()
+
+    components: DesignComponents = {}
+    for record in reader.objects.values():
+        if not isinstance(record, Record) or "_CodeName" not in record:
+            continue
+
+        name = reader.resolve(record["_CodeName"])
+        if not name:
+            continue
+
+        controls = _control_names(reader, record.get("_ControlValues"))
+        if name in components and not controls:
+            continue
+
+        components[name] = {
+            "type": reader.resolve(record.get("_ClassName")),
+            "controls": controls,
+        }
+
+    return components
+
+
+def load_design(path: str, cache_dir: str | None = None) -> DesignComponents:
+    with open(path, "rb") as f:
+        data = f.read()
+
+    design_cache = cache_path(cache_dir, "design", data) if cache_dir else None
+
+    if design_cache:
+        cached = load_cache(design_cache, CACHE_VERSION)
+        if cached is not None and "components" in cached:
+            return cached["components"]
+
+    components = read_design(data)
+
+    if design_cache:
+        save_cache(design_cache, CACHE_VERSION, {"components": components})
+
+    return components
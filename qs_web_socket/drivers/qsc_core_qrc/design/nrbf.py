@@ -0,0 +1,273 @@
+import struct
+
+from typing import Any
+
+
+class NRBFError(ValueError):
+    pass
+
+
+class Reference:
+    __slots__ = ("id",)
+
+    def __init__(self, id_: int):
+        self.id = id_
+
+    def __repr__(self) -> str:
+        return f"Reference({self.id})"
+
+
+class Record(dict):
+    def __init__(self, class_name: str, object_id: int):
+        super().__init__()
+        self.class_name = class_name
+        self.object_id = object_id
+
+
+class _End:
+    pass
+
+
+class _Nulls(int):
+    pass
+
+
+END = _End()
+
+_PRIMITIVES = {
+    1: struct.Struct("<?"),
+    2: struct.Struct("<B"),
+    6: struct.Struct("<d"),
+    7: struct.Struct("<h"),
+    8: struct.Struct("<i"),
+    9: struct.Struct("<q"),
+    10: struct.Struct("<b"),
+    11: struct.Struct("<f"),
+    12: struct.Struct("<q"),
+    13: struct.Struct("<q"),
+    14: struct.Struct("<H"),
+    15: struct.Struct("<I"),
+    16: struct.Struct("<Q"),
+}
+
+_INT32 = _PRIMITIVES[8]
+
+
+class NRBFReader:
+    """
+    Minimal reader for .NET BinaryFormatter (MS-NRBF) streams.
+
+    Objects are returned as `Record` dicts keyed by member name; references
+    between them are left as `Reference` and resolved with `resolve`.
+    """
+
+    def __init__(self, data: bytes, offset: int = 0):
+        self._data = data
+        self.offset = offset
+        self.objects: dict[int, Any] = {}
+        self._classes: dict[int, tuple[str, list[str], list | None]] = {}
+
+    def read_stream(self) -> list[Any]:
+        roots = []
+        try:
+            while self.offset < len(self._data):
+                record = self._record()
+                if record is END:
+                    break
+                roots.append(record)
+        except (IndexError, KeyError, struct.error, UnicodeDecodeError) as e:
+            raise NRBFError(f"malformed stream near offset {self.offset}: {e!r}") from e
+        return roots
+
+    def resolve(self, value: Any) -> Any:
+        while isinstance(value, Reference):
+            value = self.objects.get(value.id)
+        return value
+
+    def _byte(self) -> int:
+        value = self._data[self.offset]
+        self.offset += 1
+        return value
+
+    def _int32(self) -> int:
+        value = _INT32.unpack_from(self._data, self.offset)[0]
+        self.offset += 4
+        return value
+
+    def _string(self) -> str:
+        length = shift = 0
+        while True:
+            byte = self._byte()
+            length |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                break
+
+        end = self.offset + length
+        value = self._data[self.offset:end].decode("utf-8")
+        self.offset = end
+        return value
+
+    def _primitive(self, type_: int) -> Any:
+        fmt = _PRIMITIVES.get(type_)
+        if fmt is not None:
+            value = fmt.unpack_from(self._data, self.offset)[0]
+            self.offset += fmt.size
+            return value
+
+        if type_ in (5, 18):
+            return self._string()
+
+        if type_ == 3:
+            lead = self._data[self.offset]
+            size = 1 if lead < 0x80 else 2 if lead < 0xE0 else 3 if lead < 0xF0 else 4
+            value = self._data[self.offset:self.offset + size].decode("utf-8")
+            self.offset += size
+            return value
+
+        if type_ == 17:
+            return None
+
+        raise NRBFError(f"unsupported primitive type {type_}")
+
+    def _class_info(self) -> tuple[int, str, list[str]]:
+        object_id = self._int32()
+        name = self._string()
+        members = [self._string() for _ in range(self._int32())]
+        return object_id, name, members
+
+    def _member_types(self, count: int) -> list[tuple[int, Any]]:
+        binary_types = [self._byte() for _ in range(count)]
+        types = []
+
+        for binary_type in binary_types:
+            if binary_type in (0, 7):
+                extra = self._byte()
+            elif binary_type == 3:
+                extra = self._string()
+            elif binary_type == 4:
+                extra = (self._string(), self._int32())
+            else:
+                extra = None
+            types.append((binary_type, extra))
+
+        return types
+
+    def _members(self, record: Record, members: list[str], types: list | None):
+        i = 0
+        while i < len(members):
+            if types is not None and types[i][0] == 0:
+                record[members[i]] = self._primitive(types[i][1])
+                i += 1
+                continue
+
+            value = self._record()
+            if isinstance(value, _Nulls):
+                for _ in range(value):
+                    record[members[i]] = None
+                    i += 1
+                continue
+
+            record[members[i]] = value
+            i += 1
+
+    def _elements(self, count: int, binary_type: int, extra: Any) -> list[Any]:
+        if binary_type == 0:
+            return [self._primitive(extra) for _ in range(count)]
+
+        elements: list[Any] = []
+        while len(elements) < count:
+            value = self._record()
+            if isinstance(value, _Nulls):
+                elements.extend([None] * value)
+            else:
+                elements.append(value)
+        return elements
+
+    def _class_record(self, object_id: int, class_id: int) -> Record:
+        name, members, types = self._classes[class_id]
+        record = self.objects[object_id] = Record(name, object_id)
+        self._members(record, members, types)
+        return record
+
+    def _record(self) -> Any:
+        record_type = self._byte()
+
+        if record_type == 0:
+            self.offset += 16
+            return self._record()
+
+        if record_type == 12:
+            self._int32()
+            self._string()
+            return self._record()
+
+        if record_type in (2, 3, 4, 5):
+            object_id, name, members = self._class_info()
+            types = self._member_types(len(members)) if record_type in (4, 5) else None
+            if record_type in (3, 5):
+                self._int32()
+            self._classes[object_id] = (name, members, types)
+            return self._class_record(object_id, object_id)
+
+        if record_type == 1:
+            object_id = self._int32()
+            return self._class_record(object_id, self._int32())
+
+        if record_type == 6:
+            object_id = self._int32()
+            value = self.objects[object_id] = self._string()
+            return value
+
+        if record_type == 7:
+            object_id = self._int32()
+            array_type = self._byte()
+            rank = self._int32()
+            lengths = [self._int32() for _ in range(rank)]
+            if array_type in (3, 4, 5):
+                self.offset += 4 * rank
+
+            (binary_type, extra), = self._member_types(1)
+            count = 1
+            for length in lengths:
+                count *= length
+
+            value = self.objects[object_id] = self._elements(count, binary_type, extra)
+            return value
+
+        if record_type == 8:
+            return self._primitive(self._byte())
+
+        if record_type == 9:
+            return Reference(self._int32())
+
+        if record_type == 10:
+            return None
+
+        if record_type == 11:
+            return END
+
+        if record_type == 13:
+            return _Nulls(self._byte())
+
+        if record_type == 14:
+            return _Nulls(self._int32())
+
+        if record_type == 15:
+            object_id = self._int32()
+            count = self._int32()
+            type_ = self._byte()
+            if type_ == 2:
+                value = self._data[self.offset:self.offset + count]
+                self.offset += count
+            else:
+                value = [self._primitive(type_) for _ in range(count)]
+            self.objects[object_id] = value
+            return value
+
+        if record_type in (16, 17):
+            object_id = self._int32()
+            value = self.objects[object_id] = self._elements(self._int32(), 2, None)
+            return value
+
+        raise NRBFError(f"unsupported record type {record_type} at {self.offset - 1}")
@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+from .batching import QueuedMessage
+
+
+class Priority(IntEnum):
+    HEARTBEAT = 0
+    INTERACTIVE = 1
+    BULK = 2
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    pass
+
+
+@dataclass(slots=True)
+class QueuedItem:
+    message: QueuedMessage
+    priority: Priority = Priority.INTERACTIVE
+    deadline: float | None = None
+    future: asyncio.Future | None = None
+    enqueued: float = field(default_factory=time.monotonic)
+
+    def expired(self, now: float) -> bool:
+        return self.deadline is not None and now > self.deadline
+
+    @property
+    def abandoned(self) -> bool:
+        return self.future is not None and self.future.done()
+
+
+class PriorityLanes:
+    def __init__(self):
+        self._lanes: dict[Priority, deque[QueuedItem]] = {p: deque() for p in Priority}
+        self._ready = asyncio.Event()
+
+    def qsize(self) -> int:
+        return sum(len(lane) for lane in self._lanes.values())
+
+    def empty(self) -> bool:
+        return not any(self._lanes.values())
+
+    def put(self, item: QueuedItem):
+        self._lanes[item.priority].append(item)
+        self._ready.set()
+
+    async def wait(self):
+        while self.empty():
+            self._ready.clear()
+            await self._ready.wait()
+
+    def take(self, bulk_limit: int) -> list[QueuedItem]:
+        # Higher lanes are always drained completely; bulk work is taken a
+        # slice at a time so a resync burst cannot hold up the next button
+        # press for longer than one slice takes to write.
+        items: list[QueuedItem] = []
+
+        for priority, lane in self._lanes.items():
+            count = len(lane) if priority != Priority.BULK else min(len(lane), bulk_limit)
+            items.extend(lane.popleft() for _ in range(count))
+
+        return items
@@ -0,0 +1,41 @@
+from typing import Iterable, Iterator
+
+from .client import QRCClient
+
+
+class CoreRegistry:
+    def __init__(self):
+        self._clients: dict[str, QRCClient] = {}
+        self._rooms: dict[str, str] = {}
+        self._default: str | None = None
+
+    def __iter__(self) -> Iterator[QRCClient]:
+        return iter(self._clients.values())
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def add(self, client: QRCClient, rooms: Iterable[str] = ()):
+        if client.name in self._clients:
+            raise ValueError(f"duplicate core name: {client.name}")
+
+        self._clients[client.name] = client
+        for room in rooms:
+            self._rooms[room] = client.name
+
+        if self._default is None:
+            self._default = client.name
+
+    def get(self, key: str | None = None) -> QRCClient | None:
+        if key is None:
+            key = self._default
+
+        name = key if key in self._clients else self._rooms.get(key)
+        return self._clients.get(name)
+
+    async def disconnect(self):
+        for client in self._clients.values():
+            await client.disconnect()
+
+
+CORES = CoreRegistry()
@@ -1,14 +1,13 @@
 from logging import error
-from json import loads, JSONDecodeError
-from .errors import QRCErrorCode
 
+from ....codec import decode, DecodeError
+from .errors import QRCErrorCode, QRCError
 
-def parse_response(message: bytes, name: str) -> tuple[None, None] | tuple[str, dict]:
-    message = message.decode("utf-8")
 
+def parse_response(message: bytes, name: str) -> tuple[None, None] | tuple[str, dict]:
     try:
-        message = loads(message)
-    except JSONDecodeError as e:
+        message = decode(message)
+    except DecodeError as e:
         error("(%s) Error decoding JSON: %s", name, e)
         return None, None
 
@@ -29,7 +28,7 @@ def parse_response(message: bytes, name: str) -> tuple[None, None] | tuple[str,
                 )
             except ValueError:
                 error("(%s) JSON-RPC Error [code=%s]: %s", name, code, msg)
-            return "error", err
+            return "error", {"id": message.get("id"), **err}
 
         if "result" in message:
             return "result", {
@@ -38,3 +38,16 @@ class QRCErrorCode(IntEnum):
             QRCErrorCode.ILLEGAL_MIXER_CHANNEL: "Illegal mixer channel index.",
             QRCErrorCode.LOGON_REQUIRED: "Logon required.",
         }[self]
+
+
+class QRCError(Exception):
+    def __init__(self, code: int | None, message: str):
+        self.code = code
+        self.message = message
+
+        try:
+            label = QRCErrorCode(code).name
+        except ValueError:
+            label = f"code={code}"
+
+        super().__init__(f"[{label}] {message}")
@@ -0,0 +1,49 @@
+from typing import Any
+
+from ...codec import encode
+
+
+class PreparedMessage:
+    __slots__ = ("method", "params", "frame")
+
+    def __init__(self, method: str, params: dict[str, Any], frame: bytes):
+        self.method = method
+        self.params = params
+        self.frame = frame
+
+    def with_id(self, id_: int | str) -> "PreparedMessage":
+        # Frames rendered by CommandTemplate always end with the id member.
+        head = self.frame[:self.frame.rindex(b',"id":')]
+        return PreparedMessage(
+            self.method,
+            {**self.params, "id": id_},
+            head + b',"id":' + _encode_id(id_) + b"}\x00"
+        )
+
+
+def _encode_id(id_: int | str) -> bytes:
+    return b"%d" % id_ if isinstance(id_, int) else encode(id_)
+
+
+class CommandTemplate:
+    """
+    A QRC command encoded once, with only the JSON-RPC id left to fill in.
+
+    `render` splices the id between the pre-encoded halves of the frame, so
+    sending a known command costs no validation or JSON encoding.
+    """
+
+    def __init__(self, method: str, params: dict[str, Any]):
+        self.method = method
+        self._params = {k: v for k, v in params.items() if k != "id"}
+
+        head = encode({"jsonrpc": "2.0", "method": method, **self._params})
+        self._prefix = head[:-1] + b',"id":'
+        self._suffix = b"}\x00"
+
+    def render(self, id_: int | str) -> PreparedMessage:
+        return PreparedMessage(
+            self.method,
+            {"id": id_, **self._params},
+            self._prefix + _encode_id(id_) + self._suffix
+        )
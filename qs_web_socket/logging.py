@@ -1,8 +1,21 @@
+import atexit
 import logging
+import queue
 import sys
+import time
+
+from logging.handlers import QueueHandler, QueueListener
+
+from .config import SETTINGS
+from .metrics import REGISTRY
 
 LOG_FORMAT = "%(levelprefix)s %(asctime)s | %(name)s | %(message)s"
 
+_listener: QueueListener | None = None
+
+LOG_RECORDS_DROPPED = REGISTRY.counter(
+    "log_records_dropped_total", "Log records dropped because the log queue was full.")
+
 
 class LevelFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
@@ -10,10 +23,109 @@ class LevelFormatter(logging.Formatter):
         return super().format(record)
 
 
-def configure_logging(level=logging.DEBUG) -> None:
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket for one logger's records below WARNING.
+
+    Excess records are dropped before they are formatted or queued; the next
+    record let through says how many were suppressed.
+    """
+
+    def __init__(self, rate: float, burst: float | None = None):
+        super().__init__()
+        self._rate = rate
+        self._burst = burst if burst is not None else max(rate, 1.0)
+        self._tokens = self._burst
+        self._updated = time.monotonic()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        now = time.monotonic()
+        self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+        if self._tokens < 1:
+            self.suppressed += 1
+            return False
+
+        self._tokens -= 1
+        if self.suppressed:
+            record.msg = f"{record.msg} [{self.suppressed} similar messages suppressed]"
+            self.suppressed = 0
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Queue handler that drops records instead of blocking when the queue is
+    full. Drops are counted in ``log_records_dropped_total``, and once the
+    queue has room again a WARNING says how many were lost.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self.dropped_warnings = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            if record.levelno >= logging.WARNING:
+                self.dropped_warnings += 1
+            LOG_RECORDS_DROPPED.inc()
+            return
+
+        if self.dropped:
+            self._report_dropped()
+
+    def _report_dropped(self):
+        summary = logging.LogRecord(
+            __name__, logging.WARNING, __file__, 0,
+            "%d log records dropped with the log queue full (%d at WARNING or above)",
+            (self.dropped, self.dropped_warnings), None)
+        try:
+            self.queue.put_nowait(summary)
+        except queue.Full:
+            return
+        self.dropped = self.dropped_warnings = 0
+
+
+def _stop_listener():
+    global _listener  # pylint: disable=global-statement
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
+
+def configure_logging(level: int | str | None = None) -> None:
+    global _listener  # pylint: disable=global-statement
+
+    _stop_listener()
+
     handler = logging.StreamHandler(sys.stdout)
     handler.setFormatter(LevelFormatter(LOG_FORMAT))
 
+    # Records are written out on the listener's thread, so a slow stdout never
+    # stalls the event loop; when the queue is full new records are dropped.
+    log_queue: queue.Queue = queue.Queue(max(SETTINGS.log_queue_size, 1))
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+
     root_logger = logging.getLogger()
-    root_logger.setLevel(level)
-    root_logger.handlers = [handler]
+    root_logger.setLevel(level if level is not None else SETTINGS.log_level.upper())
+    root_logger.handlers = [DroppingQueueHandler(log_queue)]
+
+    for name, rate in SETTINGS.log_rate_limits.items():
+        logger = logging.getLogger(name)
+        logger.filters = [f for f in logger.filters if not isinstance(f, RateLimitFilter)]
+        if rate > 0:
+            logger.addFilter(RateLimitFilter(rate))
@@ -0,0 +1,200 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Any, Callable
+
+LabelValues = tuple[str, ...]
+# {"name", "kind", "documentation", "samples"}; what a process sends when
+# its metrics are merged into another's.
+Family = dict[str, Any]
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, *extra: str) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(pair for pair in extra if pair)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def label_pair(name: str, value: str) -> str:
+    return f'{name}="{_escape(value)}"'
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    # `extra` is a preformatted label pair added to every sample, e.g. the
+    # worker a sample came from.
+    @abstractmethod
+    def samples(self, extra: str = "") -> list[str]:
+        pass
+
+    def family(self, extra: str = "") -> Family:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "documentation": self.documentation,
+            "samples": self.samples(extra),
+        }
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        # An unlabelled counter reports 0 before its first increment, so a
+        # scrape can tell "nothing happened" from "not exported".
+        self._values: dict[LabelValues, float] = {} if labelnames else {(): 0.0}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self, extra: str = "") -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key, extra)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+        self._functions: dict[LabelValues, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: str):
+        self._values[self._key(labels)] = value
+
+    def track(self, func: Callable[[], float], **labels: str):
+        self._functions[self._key(labels)] = func
+
+    def samples(self, extra: str = "") -> list[str]:
+        values = dict(self._values)
+        values.update({key: func() for key, func in self._functions.items()})
+
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key, extra)} {_format_value(value)}"
+            for key, value in values.items()
+        ]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._buckets = tuple(sorted(buckets))
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        counts = self._counts.get(key)
+
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self._buckets) + 1)
+            self._sums[key] = 0.0
+
+        counts[bisect_left(self._buckets, value)] += 1
+        self._sums[key] += value
+
+    def samples(self, extra: str = "") -> list[str]:
+        lines = []
+
+        for key, counts in self._counts.items():
+            cumulative = 0
+            for bound, count in zip((*self._buckets, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, extra, le)}"
+                    f" {cumulative}")
+
+            labels = _format_labels(self.labelnames, key, extra)
+            lines.append(f"{self.name}_sum{labels} {_format_value(self._sums[key])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"duplicate metric name: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def families(self, extra: str = "") -> list[Family]:
+        return [metric.family(extra) for metric in self._metrics.values()]
+
+    def render(self, *merged: list[Family]) -> str:
+        return render_families(self.families(), *merged)
+
+
+def render_families(*sources: list[Family]) -> str:
+    # Samples of one metric from several processes go under a single
+    # HELP/TYPE header, as the text format requires.
+    merged: dict[str, Family] = {}
+    for families in sources:
+        for family in families:
+            entry = merged.setdefault(family["name"], {**family, "samples": []})
+            entry["samples"].extend(family["samples"])
+
+    lines = []
+    for family in merged.values():
+        lines.append(f"# HELP {family['name']} {family['documentation']}")
+        lines.append(f"# TYPE {family['name']} {family['kind']}")
+        lines.extend(family["samples"])
+    return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
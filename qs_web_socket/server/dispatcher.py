@@ -1,47 +1,184 @@
+import asyncio
+import time
 
-from json import dumps, loads, JSONDecodeError
+from http import HTTPStatus
 from logging import getLogger
+from typing import Any
+from urllib.parse import urlsplit, parse_qsl
 
-from websockets import ClientConnection
+from websockets import ClientConnection, ConnectionClosed, Request, Response
+from websockets.extensions.base import ServerExtensionFactory
+from websockets.extensions.permessage_deflate import ServerPerMessageDeflateFactory
 
-from .router import ROUTES
+from .router import ROUTES, CONNECT_HOOKS, DISCONNECT_HOOKS
+from .formats import format_for
+from .outbound import OutboundChannel
+from ..config import SETTINGS
 from ..drivers import DRIVERS
+from ..metrics import REGISTRY
+
+REQUEST_ID = "request_id"
+DEFLATE_DEFAULTS = {
+    "server_max_window_bits": 12,
+    "client_max_window_bits": 12,
+    "compress_settings": {"memLevel": 5},
+}
+
+CONNECTIONS: dict[str, dict[ClientConnection, OutboundChannel]] = {}
+MESSAGES_RECEIVED = REGISTRY.counter(
+    "ws_messages_received_total", "WebSocket messages received per route.", ("path",))
+HANDLER_SECONDS = REGISTRY.histogram(
+    "ws_handler_seconds", "Time spent in the route handler per message.", ("path",))
+OPEN_CONNECTIONS = REGISTRY.gauge(
+    "ws_connections", "Open WebSocket connections per route.", ("path",))
+READS_PAUSED = REGISTRY.counter(
+    "ws_reads_paused_total",
+    "Times a connection stopped reading because its in-flight limit was reached.",
+    ("path",))
 
-CONNECTIONS: dict[str, set[ClientConnection]] = {}
 logger = getLogger(__name__)
 
 
+def _route_extensions(options: dict[str, Any] | bool | None) -> list[ServerExtensionFactory]:
+    if options is None or options is False:
+        return []
+    if options is True:
+        options = {}
+    return [ServerPerMessageDeflateFactory(**{**DEFLATE_DEFAULTS, **options})]
+
+
+ROUTE_EXTENSIONS = {
+    path: _route_extensions(options) for path, options in SETTINGS.ws_compression.items()
+}
+
+
+def metrics_response(connection: ClientConnection, body: str) -> Response:
+    response = connection.respond(HTTPStatus.OK, body)
+    del response.headers["Content-Type"]
+    response.headers["Content-Type"] = "text/plain; version=0.0.4; charset=utf-8"
+    return response
+
+
+def process_request(connection: ClientConnection, request: Request) -> Response | None:
+    path = urlsplit(request.path).path
+
+    if SETTINGS.metrics_path and path == SETTINGS.metrics_path:
+        return metrics_response(connection, REGISTRY.render())
+
+    # Extensions are negotiated right after this hook, so a route with its
+    # own permessage-deflate settings swaps them in for this handshake only.
+    if path in ROUTE_EXTENSIONS:
+        connection.protocol.available_extensions = ROUTE_EXTENSIONS[path]
+
+    return None
+
+
+def echo_request_id(message: dict, response: dict) -> dict:
+    if REQUEST_ID in message:
+        return {**response, REQUEST_ID: message[REQUEST_ID]}
+    return response
+
+
+async def _run_handler(
+    handler,
+    websocket: ClientConnection,
+    channel: OutboundChannel,
+    message: dict,
+    path: str
+):
+    started = time.perf_counter()
+    try:
+        await handler(websocket, message, DRIVERS)
+    except ConnectionClosed:
+        pass
+    except Exception:
+        logger.exception("[%s] Handler failed for %s", path, message)
+        # A client waiting on its request id gets an answer either way, unless
+        # it has already gone.
+        try:
+            await channel.send(echo_request_id(
+                message, {"status": "error", "message": "internal error handling the request"}))
+        except ConnectionClosed:
+            pass
+    finally:
+        HANDLER_SECONDS.observe(time.perf_counter() - started, path=path)
+
+
 async def dispatcher(websocket: ClientConnection):
-    path = websocket.request.path
+    url = urlsplit(websocket.request.path)
+    path = url.path
+    wire_format = format_for(websocket)
 
     if path not in ROUTES:
-        await websocket.send(dumps({"error": f"unknown path {path}"}))
+        await websocket.send(
+            wire_format.encode({"error": f"unknown path {path}"}), text=wire_format.text)
         await websocket.close()
         return
 
     if path not in CONNECTIONS:
-        CONNECTIONS[path] = set({})
+        CONNECTIONS[path] = connections = {}
+        OPEN_CONNECTIONS.track(connections.__len__, path=path)
 
-    connection_set: set = CONNECTIONS[path]
-    connection_set.add(websocket)
+    channel = OutboundChannel(
+        websocket,
+        SETTINGS.outbound_queue_size,
+        SETTINGS.slow_consumer_policy,
+        dict(parse_qsl(url.query)),
+        wire_format
+    )
+    CONNECTIONS[path][websocket] = channel
 
     handler = ROUTES[path]
-    logger.info("WebSocket client connected on %s", path)
+    inflight: set[asyncio.Task] = set()
+    slots = asyncio.Semaphore(max(SETTINGS.max_inflight, 1))
+
+    def release(task: asyncio.Task):
+        inflight.discard(task)
+        slots.release()
 
-    for comm_driver in DRIVERS.values():
-        await comm_driver.ws_client_connected()
+    logger.info("WebSocket client connected on %s", path)
 
     try:
+        for hook in CONNECT_HOOKS.get(path, []):
+            await hook(channel, DRIVERS)
+
         async for raw in websocket:
-            logger.info("[%s] WS Received: %s", path, raw)
+            logger.debug("[%s] WS Received: %s", path, raw)
+            MESSAGES_RECEIVED.inc(path=path)
             try:
-                message = loads(raw)
-            except JSONDecodeError:
-                await websocket.send(dumps({"error": "invalid json"}))
+                message = wire_format.decode(raw)
+            except wire_format.decode_error:
+                await channel.send({"error": f"invalid {wire_format.name}"})
+                continue
+
+            if not isinstance(message, dict):
+                await channel.send({"status": "error", "message": "message must be an object"})
                 continue
 
-            await handler(websocket, message, DRIVERS)
+            # Messages without a request id keep the old strict ordering: they
+            # wait for everything in flight and run on their own.
+            if message.get(REQUEST_ID) is None:
+                if inflight:
+                    await asyncio.wait(inflight)
+                await _run_handler(handler, websocket, channel, message, path)
+                continue
+
+            # Waiting for a slot here stops reading from the socket, so a
+            # client that outruns the core is held back by TCP flow control.
+            if slots.locked():
+                READS_PAUSED.inc(path=path)
+            await slots.acquire()
+
+            task = asyncio.create_task(
+                _run_handler(handler, websocket, channel, message, path))
+            inflight.add(task)
+            task.add_done_callback(release)
     finally:
         logger.info("WebSocket client disconnected from %s", path)
-        connection_set: set = CONNECTIONS[path]
-        connection_set.remove(websocket)
+        for task in inflight:
+            task.cancel()
+        CONNECTIONS[path].pop(websocket, None)
+        await channel.close()
+
+        for hook in DISCONNECT_HOOKS.get(path, []):
+            await hook(channel, DRIVERS)
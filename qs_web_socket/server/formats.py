@@ -0,0 +1,97 @@
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Any, Callable, Sequence
+
+from websockets import ClientConnection, Subprotocol
+
+from ..codec import CODEC
+from ..config import SETTINGS
+
+SUBPROTOCOL_PREFIX = "qsys."
+
+logger = getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class WireFormat:
+    name: str
+    encode: Callable[[Any], bytes]
+    decode: Callable[[bytes | str], Any]
+    decode_error: type[Exception] | tuple[type[Exception], ...]
+    text: bool
+
+    @property
+    def subprotocol(self) -> Subprotocol:
+        return Subprotocol(SUBPROTOCOL_PREFIX + self.name)
+
+
+def _json_format() -> WireFormat:
+    return WireFormat("json", CODEC.encode, CODEC.decode, CODEC.decode_error, True)
+
+
+def _msgpack_format() -> WireFormat:
+    import msgpack  # pylint: disable=import-outside-toplevel
+
+    packer = msgpack.Packer()
+    return WireFormat(
+        "msgpack",
+        packer.pack,
+        msgpack.unpackb,
+        (msgpack.UnpackException, ValueError, TypeError),
+        False
+    )
+
+
+def _cbor_format() -> WireFormat:
+    import cbor2  # pylint: disable=import-outside-toplevel
+
+    return WireFormat(
+        "cbor",
+        cbor2.dumps,
+        cbor2.loads,
+        (cbor2.CBORDecodeError, TypeError),
+        False
+    )
+
+
+FORMAT_FACTORIES: dict[str, Callable[[], WireFormat]] = {
+    "json": _json_format,
+    "msgpack": _msgpack_format,
+    "cbor": _cbor_format,
+}
+
+
+def load_formats(names: Sequence[str]) -> dict[Subprotocol, WireFormat]:
+    formats: dict[Subprotocol, WireFormat] = {}
+
+    for name in names:
+        if name not in FORMAT_FACTORIES:
+            raise ValueError(f"unknown wire format: {name}")
+        try:
+            wire_format = FORMAT_FACTORIES[name]()
+        except ImportError:
+            logger.warning("Wire format %s is not installed; not offering it", name)
+            continue
+        formats[wire_format.subprotocol] = wire_format
+
+    return formats
+
+
+JSON = _json_format()
+FORMATS = load_formats(SETTINGS.ws_formats)
+
+
+def select_subprotocol(
+    _connection: ClientConnection,
+    subprotocols: Sequence[Subprotocol]
+) -> Subprotocol | None:
+    # Clients that offer nothing we know keep plain JSON text frames rather
+    # than being refused.
+    for subprotocol in subprotocols:
+        if subprotocol in FORMATS:
+            return subprotocol
+    return None
+
+
+def format_for(websocket: ClientConnection) -> WireFormat:
+    return FORMATS.get(websocket.subprotocol, JSON)
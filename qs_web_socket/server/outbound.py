@@ -0,0 +1,123 @@
+import asyncio
+
+from collections import deque
+from logging import getLogger
+from typing import Any, Callable, Literal, get_args
+
+from websockets import ClientConnection, ConnectionClosed
+
+from ..metrics import REGISTRY
+from .formats import JSON, WireFormat
+
+SlowConsumerPolicy = Literal["drop_oldest", "coalesce", "disconnect"]
+Message = str | bytes
+MergeFn = Callable[[Any, Any], Any]
+SentFn = Callable[[], None]
+
+DROPPED = REGISTRY.counter(
+    "ws_outbound_dropped_total", "Outbound messages dropped for slow clients.")
+DISCONNECTED = REGISTRY.counter(
+    "ws_slow_consumer_disconnects_total", "Clients disconnected for being too slow.")
+
+logger = getLogger(__name__)
+
+
+class OutboundChannel:
+    def __init__(
+        self,
+        websocket: ClientConnection,
+        maxsize: int = 64,
+        policy: SlowConsumerPolicy = "drop_oldest",
+        params: dict[str, str] | None = None,
+        wire_format: WireFormat = JSON
+    ):
+        if policy not in get_args(SlowConsumerPolicy):
+            raise ValueError(f"unknown slow consumer policy: {policy}")
+
+        self.websocket = websocket
+        self.params = params or {}
+        self.format = wire_format
+        self.dropped = 0
+
+        self._maxsize = max(maxsize, 1)
+        self._policy = policy
+        self._queue: deque[tuple[Message, Any, MergeFn | None, SentFn | None]] = deque()
+        self._ready = asyncio.Event()
+        self._closing = False
+        self._writer_task = asyncio.create_task(self._writer())
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def put(
+        self,
+        message: Message,
+        state: Any = None,
+        merge: MergeFn | None = None,
+        sent: SentFn | None = None
+    ) -> bool:
+        if self._closing:
+            return False
+
+        if len(self._queue) >= self._maxsize:
+            return self._overflow(message, state, merge, sent)
+
+        self._queue.append((message, state, merge, sent))
+        self._ready.set()
+        return True
+
+    def _overflow(
+        self,
+        message: Message,
+        state: Any,
+        merge: MergeFn | None,
+        sent: SentFn | None
+    ) -> bool:
+        if self._policy == "disconnect":
+            logger.warning("Disconnecting slow WebSocket client %s",
+                           self.websocket.remote_address)
+            DISCONNECTED.inc()
+            self._closing = True
+            self._queue.clear()
+            asyncio.create_task(self.websocket.close(1008, "client too slow"))
+            return False
+
+        if self._policy == "coalesce" and merge is not None:
+            _, tail_state, tail_merge, tail_sent = self._queue[-1]
+            if tail_merge is merge:
+                # The merged update is as late as its oldest part.
+                merged = merge(tail_state, state)
+                self._queue[-1] = (self.format.encode(merged), merged, merge, tail_sent or sent)
+                return True
+
+        self._queue.popleft()
+        self._queue.append((message, state, merge, sent))
+        self.dropped += 1
+        DROPPED.inc()
+        return True
+
+    async def _writer(self):
+        try:
+            while True:
+                while not self._queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+
+                message, _, _, sent = self._queue.popleft()
+                await self.websocket.send(message, text=self.format.text)
+                if sent is not None:
+                    sent()
+        except ConnectionClosed:
+            pass
+        except Exception as e:
+            logger.warning("WebSocket send to %s failed: %s",
+                           self.websocket.remote_address, e)
+            await self.websocket.close()
+
+    async def send(self, message: Any):
+        await self.websocket.send(self.format.encode(message), text=self.format.text)
+
+    async def close(self):
+        self._closing = True
+        self._queue.clear()
+        self._writer_task.cancel()
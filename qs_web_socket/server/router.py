@@ -1,6 +1,8 @@
 from typing import Any, Awaitable, Callable
 
 ROUTES: dict[str, Callable] = {}
+CONNECT_HOOKS: dict[str, list[Callable]] = {}
+DISCONNECT_HOOKS: dict[str, list[Callable]] = {}
 
 
 def ws_route(path: str):
@@ -8,3 +10,17 @@ def ws_route(path: str):
         ROUTES[path] = func
         return func
     return decorator
+
+
+def ws_connect(path: str):
+    def decorator(func: Callable[[Any, dict], Awaitable[None]]):
+        CONNECT_HOOKS.setdefault(path, []).append(func)
+        return func
+    return decorator
+
+
+def ws_disconnect(path: str):
+    def decorator(func: Callable[[Any, dict], Awaitable[None]]):
+        DISCONNECT_HOOKS.setdefault(path, []).append(func)
+        return func
+    return decorator